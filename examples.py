@@ -6,188 +6,285 @@ These examples demonstrate how to use Mini-SLURM for heavy AI/HPC tasks.
 All tasks are located in the tasks/ directory.
 """
 
+import json
 import subprocess
+import shutil
 import time
 import sys
 import os
+from contextlib import contextmanager
+
+try:
+    from mini_slurm import MiniSlurm, parse_mem, with_env
+except ImportError:  # fall back to the installed CLI
+    MiniSlurm = None
 
 # Get the directory where this script is located
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 TASKS_DIR = os.path.join(SCRIPT_DIR, "tasks")
 
+# Task script paths, resolved once at import
+_TASK = {
+    name: os.path.join(TASKS_DIR, fname)
+    for name, fname in (
+        ("train", "train_neural_network.py"),
+        ("mc", "monte_carlo_simulation.py"),
+        ("matrix", "matrix_operations.py"),
+        ("image", "image_processing.py"),
+        ("data", "data_processing.py"),
+        ("sci", "scientific_computing.py"),
+        ("elastic", "elastic_training.py"),
+    )
+}
+
+# Submit through the `mini-slurm` CLI instead of in-process when requested
+USE_CLI = MiniSlurm is None or bool(
+    shutil.which("mini-slurm") and os.environ.get("MINISLURM_USE_CLI")
+)
+
+_ms = None
+_batch = None
+
+
+def _job(cpus, mem, priority, command, env=None, elastic=False, min_cpus=None, max_cpus=None):
+    """Build a batch-submit manifest entry."""
+    job = {"cpus": cpus, "mem": mem, "priority": priority, "command": command}
+    if env:
+        job["env"] = {key: str(value) for key, value in env.items()}
+    if elastic:
+        job.update(elastic=True, min_cpus=min_cpus, max_cpus=max_cpus)
+    return job
+
+
+def _submit(*args, **kwargs):
+    """Submit a single job, or queue it if a _batched() block is active."""
+    _queue([_job(*args, **kwargs)])
+
+
+def _queue(entries):
+    """Add manifest entries to the active batch, or submit them now."""
+    if _batch is not None:
+        _batch.extend(entries)
+    else:
+        _submit_many(entries)
+
+
+def _submit_many(entries):
+    """Submit manifest entries with one CLI call or one database transaction."""
+    global _ms
+    if not entries:
+        return
+    if USE_CLI:
+        subprocess.run(["mini-slurm", "batch-submit", "-"], input=json.dumps(entries),
+                       text=True, close_fds=False)
+        return
+
+    if _ms is None:
+        _ms = MiniSlurm()
+    _ms.submit_jobs([
+        {
+            "cpus": job["cpus"],
+            "mem_mb": parse_mem(job["mem"]),
+            "command": with_env(job["command"], job.get("env")),
+            "priority": job["priority"],
+            "is_elastic": job.get("elastic", False),
+            "min_cpus": job.get("min_cpus"),
+            "max_cpus": job.get("max_cpus"),
+        }
+        for job in entries
+    ])
+
+
+@contextmanager
+def _batched():
+    """Collect _submit() calls and flush them together on exit (nestable)."""
+    global _batch
+    if _batch is not None:
+        yield
+        return
+    _batch = []
+    try:
+        yield
+        _submit_many(_batch)
+    finally:
+        _batch = None
+
+
+def _table_jobs(script, rows, env_builder):
+    """
+    Build the manifest entries for a config table.
+
+    Rows end with (cpus, mem, priority); the leading fields are passed to
+    env_builder, which returns the job's env vars and a short description.
+    """
+    jobs = []
+    for row in rows:
+        *params, cpus, mem, priority = row
+        env, desc = env_builder(*params)
+        jobs.append((_job(cpus, mem, priority, f"python3 {script}", env=env), desc))
+    return jobs
+
+
+def _submit_table(script, rows, env_builder, label):
+    """Submit one job per row of a config table as a single batch."""
+    jobs = _table_jobs(script, rows, env_builder)
+    with _batched():
+        _queue([entry for entry, _ in jobs])
+        for i, (_, desc) in enumerate(jobs):
+            print(f"  Submitted {label} {i+1}{desc}")
+
+
+def _train_env(model_size, epochs, batch_size):
+    env = {"EPOCHS": epochs, "BATCH_SIZE": batch_size, "MODEL_SIZE": model_size}
+    return env, f": {model_size} model, {epochs} epochs"
+
+
+def _monte_carlo_env(sim_type, samples):
+    return {"SIM_TYPE": sim_type, "NUM_SAMPLES": samples}, f": {sim_type} with {samples:,} samples"
+
+
+def _matrix_env(op, size, iterations):
+    env = {"OP": op, "SIZE": size, "ITERATIONS": iterations}
+    return env, f": {op} on {size}x{size} matrix"
+
+
+def _image_env(task, num_images, size):
+    size_var = "IMAGE_SIZE" if task == "batch" else "FEATURE_DIM"
+    env = {"TASK": task, "NUM_IMAGES": num_images, size_var: size}
+    return env, f": {task} with {num_images} images"
+
+
+# Env var names for the task-specific fields of the data/scientific tables
+_DATA_VARS = {
+    "dataset": ("NUM_ROWS", "NUM_FEATURES"),
+    "timeseries": ("NUM_SERIES", "SERIES_LENGTH"),
+    "sort": ("NUM_ELEMENTS",),
+}
+_SCIENTIFIC_VARS = {
+    "heat": ("GRID_SIZE", "TIME_STEPS"),
+    "nbody": ("NUM_BODIES", "TIME_STEPS"),
+    "linear": ("MATRIX_SIZE",),
+    "fea": ("GRID_SIZE",),
+}
+
+
+def _data_env(task, *args):
+    return {"TASK": task, **dict(zip(_DATA_VARS[task], args))}, f": {task}"
+
+
+def _scientific_env(sim_type, *args):
+    return {"SIM_TYPE": sim_type, **dict(zip(_SCIENTIFIC_VARS[sim_type], args))}, f": {sim_type}"
+
+
+# Workload tables. Every row ends with (cpus, mem, priority).
+
+# (model_size, epochs, batch_size, ...)
+_TRAINING = (
+    ("small", 50, 128, 2, "4GB", 10),  # Higher priority for smaller jobs
+    ("medium", 100, 256, 4, "8GB", 9),
+    ("large", 200, 512, 8, "16GB", 8),
+)
+# (type, samples, ...)
+_MONTE_CARLO = (
+    ("pi", 100_000_000, 4, "4GB", 5),
+    ("pi", 500_000_000, 8, "8GB", 3),
+    ("option", 10_000_000, 4, "4GB", 5),
+)
+# (op, size, iterations, ...)
+_MATRIX = (
+    ("multiply", 3000, 5, 4, "8GB", 5),
+    ("multiply", 5000, 10, 8, "16GB", 3),
+    ("svd", 3000, 1, 4, "8GB", 5),
+    ("cholesky", 4000, 1, 4, "8GB", 5),
+)
+# (task, num_images, image_size or feature_dim, ...)
+_IMAGE = (
+    ("batch", 500, 1024, 4, "8GB", 5),
+    ("batch", 1000, 2048, 8, "16GB", 3),
+    ("features", 500, 2048, 4, "8GB", 5),
+)
+# (task, task-specific sizes..., ...)
+_DATA = (
+    ("dataset", 5_000_000, 50, 4, "8GB", 5),
+    ("dataset", 10_000_000, 100, 8, "16GB", 3),
+    ("timeseries", 500, 5000, 4, "8GB", 5),
+    ("sort", 25_000_000, 4, "8GB", 5),
+)
+# (type, type-specific sizes..., ...)
+_SCIENTIFIC = (
+    ("heat", 500, 500, 4, "8GB", 5),
+    ("heat", 1000, 1000, 8, "16GB", 3),
+    ("nbody", 5000, 500, 4, "8GB", 5),
+    ("linear", 3000, 4, "8GB", 5),
+    ("fea", 300, 4, "8GB", 5),
+)
+
+# MacBook Air-friendly variants (16GB RAM, 2GB per job)
+_MACBOOK_TRAINING = (
+    ("small", 20, 64, 2, "2GB", 10),
+    ("small", 30, 128, 2, "2GB", 9),
+)
+_MACBOOK_MONTE_CARLO = (
+    ("pi", 50_000_000, 2, "2GB", 5),
+    ("option", 5_000_000, 2, "2GB", 5),
+)
+_MACBOOK_MATRIX = (
+    ("multiply", 1500, 3, 2, "2GB", 5),
+    ("svd", 1500, 1, 2, "2GB", 5),
+)
+_MACBOOK_IMAGE = (
+    ("batch", 200, 512, 2, "2GB", 5),
+    ("features", 200, 1024, 2, "2GB", 5),
+)
+_MACBOOK_DATA = (
+    ("dataset", 1_000_000, 20, 2, "2GB", 5),
+    ("timeseries", 200, 2000, 2, "2GB", 5),
+)
+_MACBOOK_SCIENTIFIC = (
+    ("heat", 300, 200, 2, "2GB", 5),
+    ("linear", 1500, 2, "2GB", 5),
+)
+
 
 def submit_neural_network_training():
     """Submit multiple neural network training jobs with different configurations."""
     print("Submitting neural network training jobs...")
-    
-    configs = [
-        {"epochs": 50, "batch_size": 128, "model_size": "small", "cpus": 2, "mem": "4GB"},
-        {"epochs": 100, "batch_size": 256, "model_size": "medium", "cpus": 4, "mem": "8GB"},
-        {"epochs": 200, "batch_size": 512, "model_size": "large", "cpus": 8, "mem": "16GB"},
-    ]
-    
-    for i, config in enumerate(configs):
-        cmd = [
-            "mini-slurm", "submit",
-            "--cpus", str(config["cpus"]),
-            "--mem", config["mem"],
-            "--priority", str(10 - i),  # Higher priority for smaller jobs
-            f"EPOCHS={config['epochs']} BATCH_SIZE={config['batch_size']} MODEL_SIZE={config['model_size']} "
-            f"python3 {os.path.join(TASKS_DIR, 'train_neural_network.py')}"
-        ]
-        subprocess.run(cmd)
-        print(f"  Submitted training job {i+1}: {config['model_size']} model, {config['epochs']} epochs")
-    
+    _submit_table(_TASK['train'], _TRAINING, _train_env, "training job")
     print("\nView queue: mini-slurm queue")
 
 
 def submit_monte_carlo_simulations():
     """Submit Monte Carlo simulation jobs."""
     print("Submitting Monte Carlo simulation jobs...")
-    
-    simulations = [
-        {"type": "pi", "samples": 100_000_000, "cpus": 4, "mem": "4GB", "priority": 5},
-        {"type": "pi", "samples": 500_000_000, "cpus": 8, "mem": "8GB", "priority": 3},
-        {"type": "option", "samples": 10_000_000, "cpus": 4, "mem": "4GB", "priority": 5},
-    ]
-    
-    for i, sim in enumerate(simulations):
-        cmd = [
-            "mini-slurm", "submit",
-            "--cpus", str(sim["cpus"]),
-            "--mem", sim["mem"],
-            "--priority", str(sim["priority"]),
-            f"SIM_TYPE={sim['type']} NUM_SAMPLES={sim['samples']} "
-            f"python3 {os.path.join(TASKS_DIR, 'monte_carlo_simulation.py')}"
-        ]
-        subprocess.run(cmd)
-        print(f"  Submitted Monte Carlo job {i+1}: {sim['type']} with {sim['samples']:,} samples")
-    
+    _submit_table(_TASK['mc'], _MONTE_CARLO, _monte_carlo_env, "Monte Carlo job")
     print("\nView queue: mini-slurm queue")
 
 
 def submit_matrix_operations():
     """Submit heavy matrix operation jobs."""
     print("Submitting matrix operation jobs...")
-    
-    operations = [
-        {"op": "multiply", "size": 3000, "iterations": 5, "cpus": 4, "mem": "8GB", "priority": 5},
-        {"op": "multiply", "size": 5000, "iterations": 10, "cpus": 8, "mem": "16GB", "priority": 3},
-        {"op": "svd", "size": 3000, "iterations": 1, "cpus": 4, "mem": "8GB", "priority": 5},
-        {"op": "cholesky", "size": 4000, "iterations": 1, "cpus": 4, "mem": "8GB", "priority": 5},
-    ]
-    
-    for i, op_config in enumerate(operations):
-        cmd = [
-            "mini-slurm", "submit",
-            "--cpus", str(op_config["cpus"]),
-            "--mem", op_config["mem"],
-            "--priority", str(op_config["priority"]),
-            f"OP={op_config['op']} SIZE={op_config['size']} ITERATIONS={op_config['iterations']} "
-            f"python3 {os.path.join(TASKS_DIR, 'matrix_operations.py')}"
-        ]
-        subprocess.run(cmd)
-        print(f"  Submitted matrix operation {i+1}: {op_config['op']} on {op_config['size']}x{op_config['size']} matrix")
-    
+    _submit_table(_TASK['matrix'], _MATRIX, _matrix_env, "matrix operation")
     print("\nView queue: mini-slurm queue")
 
 
 def submit_image_processing():
     """Submit image processing pipeline jobs."""
     print("Submitting image processing jobs...")
-    
-    jobs = [
-        {"task": "batch", "num_images": 500, "image_size": 1024, "cpus": 4, "mem": "8GB", "priority": 5},
-        {"task": "batch", "num_images": 1000, "image_size": 2048, "cpus": 8, "mem": "16GB", "priority": 3},
-        {"task": "features", "num_images": 500, "feature_dim": 2048, "cpus": 4, "mem": "8GB", "priority": 5},
-    ]
-    
-    for i, job in enumerate(jobs):
-        env_vars = f"TASK={job['task']} NUM_IMAGES={job['num_images']}"
-        if job['task'] == "batch":
-            env_vars += f" IMAGE_SIZE={job['image_size']}"
-        else:
-            env_vars += f" FEATURE_DIM={job['feature_dim']}"
-        
-        cmd = [
-            "mini-slurm", "submit",
-            "--cpus", str(job["cpus"]),
-            "--mem", job["mem"],
-            "--priority", str(job["priority"]),
-            f"{env_vars} python3 {os.path.join(TASKS_DIR, 'image_processing.py')}"
-        ]
-        subprocess.run(cmd)
-        print(f"  Submitted image processing job {i+1}: {job['task']} with {job['num_images']} images")
-    
+    _submit_table(_TASK['image'], _IMAGE, _image_env, "image processing job")
     print("\nView queue: mini-slurm queue")
 
 
 def submit_data_processing():
     """Submit data processing and ETL jobs."""
     print("Submitting data processing jobs...")
-    
-    jobs = [
-        {"task": "dataset", "num_rows": 5_000_000, "num_features": 50, "cpus": 4, "mem": "8GB", "priority": 5},
-        {"task": "dataset", "num_rows": 10_000_000, "num_features": 100, "cpus": 8, "mem": "16GB", "priority": 3},
-        {"task": "timeseries", "num_series": 500, "series_length": 5000, "cpus": 4, "mem": "8GB", "priority": 5},
-        {"task": "sort", "num_elements": 25_000_000, "cpus": 4, "mem": "8GB", "priority": 5},
-    ]
-    
-    for i, job in enumerate(jobs):
-        env_vars = f"TASK={job['task']}"
-        if job['task'] == "dataset":
-            env_vars += f" NUM_ROWS={job['num_rows']} NUM_FEATURES={job['num_features']}"
-        elif job['task'] == "timeseries":
-            env_vars += f" NUM_SERIES={job['num_series']} SERIES_LENGTH={job['series_length']}"
-        else:
-            env_vars += f" NUM_ELEMENTS={job['num_elements']}"
-        
-        cmd = [
-            "mini-slurm", "submit",
-            "--cpus", str(job["cpus"]),
-            "--mem", job["mem"],
-            "--priority", str(job["priority"]),
-            f"{env_vars} python3 {os.path.join(TASKS_DIR, 'data_processing.py')}"
-        ]
-        subprocess.run(cmd)
-        print(f"  Submitted data processing job {i+1}: {job['task']}")
-    
+    _submit_table(_TASK['data'], _DATA, _data_env, "data processing job")
     print("\nView queue: mini-slurm queue")
 
 
 def submit_scientific_computing():
     """Submit scientific computing simulation jobs."""
     print("Submitting scientific computing jobs...")
-    
-    simulations = [
-        {"type": "heat", "grid_size": 500, "time_steps": 500, "cpus": 4, "mem": "8GB", "priority": 5},
-        {"type": "heat", "grid_size": 1000, "time_steps": 1000, "cpus": 8, "mem": "16GB", "priority": 3},
-        {"type": "nbody", "num_bodies": 5000, "time_steps": 500, "cpus": 4, "mem": "8GB", "priority": 5},
-        {"type": "linear", "matrix_size": 3000, "cpus": 4, "mem": "8GB", "priority": 5},
-        {"type": "fea", "grid_size": 300, "cpus": 4, "mem": "8GB", "priority": 5},
-    ]
-    
-    for i, sim in enumerate(simulations):
-        env_vars = f"SIM_TYPE={sim['type']}"
-        if sim['type'] == "heat":
-            env_vars += f" GRID_SIZE={sim['grid_size']} TIME_STEPS={sim['time_steps']}"
-        elif sim['type'] == "nbody":
-            env_vars += f" NUM_BODIES={sim['num_bodies']} TIME_STEPS={sim['time_steps']}"
-        elif sim['type'] == "linear":
-            env_vars += f" MATRIX_SIZE={sim['matrix_size']}"
-        else:
-            env_vars += f" GRID_SIZE={sim['grid_size']}"
-        
-        cmd = [
-            "mini-slurm", "submit",
-            "--cpus", str(sim["cpus"]),
-            "--mem", sim["mem"],
-            "--priority", str(sim["priority"]),
-            f"{env_vars} python3 {os.path.join(TASKS_DIR, 'scientific_computing.py')}"
-        ]
-        subprocess.run(cmd)
-        print(f"  Submitted scientific computing job {i+1}: {sim['type']}")
-    
+    _submit_table(_TASK['sci'], _SCIENTIFIC, _scientific_env, "scientific computing job")
     print("\nView queue: mini-slurm queue")
 
 
@@ -204,29 +301,27 @@ def submit_elastic_training_jobs():
     print()
     
     # Submit elastic training job
-    cmd = [
-        "mini-slurm", "submit",
-        "--elastic",
-        "--cpus", "2",  # Start with 2 CPUs
-        "--min-cpus", "2",  # Minimum 2 CPUs
-        "--max-cpus", "8",  # Can scale up to 8 CPUs
-        "--mem", "4GB",
-        "--priority", "5",
-        f"EPOCHS=30 python3 {os.path.join(TASKS_DIR, 'elastic_training.py')}"
-    ]
-    subprocess.run(cmd)
+    _submit(
+        cpus=2,  # Start with 2 CPUs
+        mem="4GB",
+        priority=5,
+        command=f"python3 {_TASK['elastic']}",
+        env={"EPOCHS": 30},
+        elastic=True,
+        min_cpus=2,  # Minimum 2 CPUs
+        max_cpus=8,  # Can scale up to 8 CPUs
+    )
     print("  Submitted elastic training job (2-8 CPUs)")
     
     # Submit a high-priority job that will trigger scale-down
     time.sleep(1)
-    cmd = [
-        "mini-slurm", "submit",
-        "--cpus", "4",
-        "--mem", "4GB",
-        "--priority", "10",  # Higher priority - will trigger scale-down
-        f"EPOCHS=20 python3 {os.path.join(TASKS_DIR, 'train_neural_network.py')}"
-    ]
-    subprocess.run(cmd)
+    _submit(
+        cpus=4,
+        mem="4GB",
+        priority=10,  # Higher priority - will trigger scale-down
+        command=f"python3 {_TASK['train']}",
+        env={"EPOCHS": 20},
+    )
     print("  Submitted high-priority job (will trigger elastic scale-down)")
     
     print("\n" + "=" * 60)
@@ -244,124 +339,24 @@ def submit_macbook_friendly_workloads():
     print("=" * 60)
     print()
     
-    print("1. Neural Network Training Jobs (lightweight)")
-    configs = [
-        {"epochs": 20, "batch_size": 64, "model_size": "small", "cpus": 2, "mem": "2GB"},
-        {"epochs": 30, "batch_size": 128, "model_size": "small", "cpus": 2, "mem": "2GB"},
-    ]
-    for i, config in enumerate(configs):
-        cmd = [
-            "mini-slurm", "submit",
-            "--cpus", str(config["cpus"]),
-            "--mem", config["mem"],
-            "--priority", str(10 - i),
-            f"EPOCHS={config['epochs']} BATCH_SIZE={config['batch_size']} MODEL_SIZE={config['model_size']} "
-            f"python3 {os.path.join(TASKS_DIR, 'train_neural_network.py')}"
-        ]
-        subprocess.run(cmd)
-        print(f"  Submitted training job {i+1}")
-    time.sleep(1)
+    with _batched():
+        print("1. Neural Network Training Jobs (lightweight)")
+        _submit_table(_TASK['train'], _MACBOOK_TRAINING, _train_env, "training job")
     
-    print("\n2. Monte Carlo Simulations (reduced samples)")
-    simulations = [
-        {"type": "pi", "samples": 50_000_000, "cpus": 2, "mem": "2GB", "priority": 5},
-        {"type": "option", "samples": 5_000_000, "cpus": 2, "mem": "2GB", "priority": 5},
-    ]
-    for i, sim in enumerate(simulations):
-        cmd = [
-            "mini-slurm", "submit",
-            "--cpus", str(sim["cpus"]),
-            "--mem", sim["mem"],
-            "--priority", str(sim["priority"]),
-            f"SIM_TYPE={sim['type']} NUM_SAMPLES={sim['samples']} "
-            f"python3 {os.path.join(TASKS_DIR, 'monte_carlo_simulation.py')}"
-        ]
-        subprocess.run(cmd)
-        print(f"  Submitted Monte Carlo job {i+1}")
-    time.sleep(1)
+        print("\n2. Monte Carlo Simulations (reduced samples)")
+        _submit_table(_TASK['mc'], _MACBOOK_MONTE_CARLO, _monte_carlo_env, "Monte Carlo job")
     
-    print("\n3. Matrix Operations (smaller matrices)")
-    operations = [
-        {"op": "multiply", "size": 1500, "iterations": 3, "cpus": 2, "mem": "2GB", "priority": 5},
-        {"op": "svd", "size": 1500, "iterations": 1, "cpus": 2, "mem": "2GB", "priority": 5},
-    ]
-    for i, op_config in enumerate(operations):
-        cmd = [
-            "mini-slurm", "submit",
-            "--cpus", str(op_config["cpus"]),
-            "--mem", op_config["mem"],
-            "--priority", str(op_config["priority"]),
-            f"OP={op_config['op']} SIZE={op_config['size']} ITERATIONS={op_config['iterations']} "
-            f"python3 {os.path.join(TASKS_DIR, 'matrix_operations.py')}"
-        ]
-        subprocess.run(cmd)
-        print(f"  Submitted matrix operation {i+1}")
-    time.sleep(1)
+        print("\n3. Matrix Operations (smaller matrices)")
+        _submit_table(_TASK['matrix'], _MACBOOK_MATRIX, _matrix_env, "matrix operation")
     
-    print("\n4. Image Processing (fewer images)")
-    jobs = [
-        {"task": "batch", "num_images": 200, "image_size": 512, "cpus": 2, "mem": "2GB", "priority": 5},
-        {"task": "features", "num_images": 200, "feature_dim": 1024, "cpus": 2, "mem": "2GB", "priority": 5},
-    ]
-    for i, job in enumerate(jobs):
-        env_vars = f"TASK={job['task']} NUM_IMAGES={job['num_images']}"
-        if job['task'] == "batch":
-            env_vars += f" IMAGE_SIZE={job['image_size']}"
-        else:
-            env_vars += f" FEATURE_DIM={job['feature_dim']}"
-        cmd = [
-            "mini-slurm", "submit",
-            "--cpus", str(job["cpus"]),
-            "--mem", job["mem"],
-            "--priority", str(job["priority"]),
-            f"{env_vars} python3 {os.path.join(TASKS_DIR, 'image_processing.py')}"
-        ]
-        subprocess.run(cmd)
-        print(f"  Submitted image processing job {i+1}")
-    time.sleep(1)
+        print("\n4. Image Processing (fewer images)")
+        _submit_table(_TASK['image'], _MACBOOK_IMAGE, _image_env, "image processing job")
     
-    print("\n5. Data Processing (smaller datasets)")
-    jobs = [
-        {"task": "dataset", "num_rows": 1_000_000, "num_features": 20, "cpus": 2, "mem": "2GB", "priority": 5},
-        {"task": "timeseries", "num_series": 200, "series_length": 2000, "cpus": 2, "mem": "2GB", "priority": 5},
-    ]
-    for i, job in enumerate(jobs):
-        env_vars = f"TASK={job['task']}"
-        if job['task'] == "dataset":
-            env_vars += f" NUM_ROWS={job['num_rows']} NUM_FEATURES={job['num_features']}"
-        else:
-            env_vars += f" NUM_SERIES={job['num_series']} SERIES_LENGTH={job['series_length']}"
-        cmd = [
-            "mini-slurm", "submit",
-            "--cpus", str(job["cpus"]),
-            "--mem", job["mem"],
-            "--priority", str(job["priority"]),
-            f"{env_vars} python3 {os.path.join(TASKS_DIR, 'data_processing.py')}"
-        ]
-        subprocess.run(cmd)
-        print(f"  Submitted data processing job {i+1}")
-    time.sleep(1)
+        print("\n5. Data Processing (smaller datasets)")
+        _submit_table(_TASK['data'], _MACBOOK_DATA, _data_env, "data processing job")
     
-    print("\n6. Scientific Computing (smaller grids)")
-    simulations = [
-        {"type": "heat", "grid_size": 300, "time_steps": 200, "cpus": 2, "mem": "2GB", "priority": 5},
-        {"type": "linear", "matrix_size": 1500, "cpus": 2, "mem": "2GB", "priority": 5},
-    ]
-    for i, sim in enumerate(simulations):
-        env_vars = f"SIM_TYPE={sim['type']}"
-        if sim['type'] == "heat":
-            env_vars += f" GRID_SIZE={sim['grid_size']} TIME_STEPS={sim['time_steps']}"
-        else:
-            env_vars += f" MATRIX_SIZE={sim['matrix_size']}"
-        cmd = [
-            "mini-slurm", "submit",
-            "--cpus", str(sim["cpus"]),
-            "--mem", sim["mem"],
-            "--priority", str(sim["priority"]),
-            f"{env_vars} python3 {os.path.join(TASKS_DIR, 'scientific_computing.py')}"
-        ]
-        subprocess.run(cmd)
-        print(f"  Submitted scientific computing job {i+1}")
+        print("\n6. Scientific Computing (smaller grids)")
+        _submit_table(_TASK['sci'], _MACBOOK_SCIENTIFIC, _scientific_env, "scientific computing job")
     
     print("\n" + "=" * 60)
     print("All MacBook Air-friendly jobs submitted!")
@@ -377,28 +372,25 @@ def submit_all_heavy_workloads():
     print("=" * 60)
     print()
     
-    print("1. Neural Network Training Jobs")
-    submit_neural_network_training()
-    time.sleep(1)
+    # One batch for the whole suite, flushed when the block exits
+    with _batched():
+        print("1. Neural Network Training Jobs")
+        submit_neural_network_training()
     
-    print("\n2. Monte Carlo Simulations")
-    submit_monte_carlo_simulations()
-    time.sleep(1)
+        print("\n2. Monte Carlo Simulations")
+        submit_monte_carlo_simulations()
     
-    print("\n3. Matrix Operations")
-    submit_matrix_operations()
-    time.sleep(1)
+        print("\n3. Matrix Operations")
+        submit_matrix_operations()
     
-    print("\n4. Image Processing")
-    submit_image_processing()
-    time.sleep(1)
+        print("\n4. Image Processing")
+        submit_image_processing()
     
-    print("\n5. Data Processing")
-    submit_data_processing()
-    time.sleep(1)
+        print("\n5. Data Processing")
+        submit_data_processing()
     
-    print("\n6. Scientific Computing")
-    submit_scientific_computing()
+        print("\n6. Scientific Computing")
+        submit_scientific_computing()
     
     print("\n" + "=" * 60)
     print("All jobs submitted! Use 'mini-slurm queue' to view status.")
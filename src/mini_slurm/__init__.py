@@ -9,7 +9,7 @@ __version__ = "0.1.3"
 
 from .core import MiniSlurm, TopologyConfig
 from .database import init_db, get_conn
-from .utils import parse_mem, format_ts, current_user
+from .utils import parse_mem, format_ts, current_user, with_env
 
 __all__ = [
     "MiniSlurm",
@@ -19,4 +19,5 @@ __all__ = [
     "parse_mem",
     "format_ts",
     "current_user",
+    "with_env",
 ]
@@ -0,0 +1,6 @@
+"""Run the mini-slurm CLI with ``python -m mini_slurm``."""
+
+from .cli import main
+
+if __name__ == "__main__":
+    main()
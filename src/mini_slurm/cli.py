@@ -2,14 +2,18 @@
 
 import argparse
 import json
-from .core import MiniSlurm
-from .utils import parse_mem, format_ts
+import sys
+from functools import lru_cache
+from typing import Optional
+from .core import ELASTIC_RESCALE_GAP, MiniSlurm
+from .utils import parse_mem, format_ts, with_env
 
 
 def cmd_submit(args):
     ms = MiniSlurm()
     mem_mb = parse_mem(args.mem)
-    command = " ".join(args.command)
+    argv = args.job_command[1:] if args.job_command[:1] == ["--"] else args.job_command
+    command = with_env(" ".join(argv), dict(args.env))
     
     is_elastic = args.elastic
     min_cpus = args.min_cpus if args.min_cpus else None
@@ -38,35 +42,72 @@ def cmd_submit(args):
     print(f"  command={command}")
 
 
+def cmd_batch_submit(args):
+    """Submit every job listed in a JSON manifest in one transaction."""
+    if args.manifest == "-":
+        manifest = json.load(sys.stdin)
+    else:
+        with open(args.manifest) as f:
+            manifest = json.load(f)
+
+    jobs = []
+    for entry in manifest:
+        jobs.append({
+            "cpus": int(entry["cpus"]),
+            "mem_mb": parse_mem(str(entry["mem"])),
+            "command": with_env(entry["command"], entry.get("env")),
+            "priority": int(entry.get("priority", 0)),
+            "is_elastic": bool(entry.get("elastic", False)),
+            "min_cpus": entry.get("min_cpus"),
+            "max_cpus": entry.get("max_cpus"),
+        })
+
+    ms = MiniSlurm()
+    job_ids = ms.submit_jobs(jobs)
+    for job_id, job in zip(job_ids, jobs):
+        print(f"Submitted job {job_id}: {job['command']}")
+
+
+# Decoder for the JSON-encoded nodes column
+_json_decode = json.JSONDecoder().decode
+
+# Column headings and row layout for `queue`
+_QUEUE_HEADER = (f"{'ID':>4} {'STAT':>8} {'CPU':>3} {'MEM(MB)':>7} {'PRI':>3} {'WAIT(s)':>8} "
+                 f"{'RUN(s)':>8} {'ELASTIC':>8} {'SUBMIT':>19} COMMAND")
+# %-formatting: the fastest of the pure-Python options for fixed layouts
+_QUEUE_ROW = "%4s %8s %3s %7s %3s %8.1f %8.1f %8s %19s %s"
+_QUEUE_WRITE_CHUNK = 64 * 1024
+
+
 def cmd_queue(args):
     ms = MiniSlurm()
     rows = ms.list_jobs(status=args.status)
-    if not rows:
+    # Format rows as the cursor yields them and write them out in ~64 KB
+    # chunks: a handful of write() calls, without holding the whole job
+    # history in memory.
+    lines = [_QUEUE_HEADER]
+    buffered = 0
+    job_id = None
+    for (job_id, command, cpus, mem_mb, status, priority,
+         submit_time, start_time, end_time, wait_time, runtime,
+         is_elastic, min_cpus, max_cpus, current_cpus) in rows:
+        elastic_str = f"{current_cpus or cpus}/{max_cpus}" if is_elastic else ""
+        line = _QUEUE_ROW % (job_id, status, cpus, mem_mb, priority,
+                             wait_time or 0, runtime or 0, elastic_str,
+                             format_ts(submit_time), command)
+        lines.append(line)
+        buffered += len(line)
+        if buffered >= _QUEUE_WRITE_CHUNK:
+            lines.append("")
+            sys.stdout.write("\n".join(lines))
+            lines.clear()
+            buffered = 0
+    if job_id is None:
         print("No jobs found.")
         return
-    print(f"{'ID':>4} {'STAT':>8} {'CPU':>3} {'MEM(MB)':>7} {'PRI':>3} {'WAIT(s)':>8} "
-          f"{'RUN(s)':>8} {'ELASTIC':>8} {'SUBMIT':>19} COMMAND")
-    for row in rows:
-        if len(row) >= 15:  # New format with elastic fields
-            (job_id, command, cpus, mem_mb, status, priority,
-             submit_time, start_time, end_time, wait_time, runtime,
-             is_elastic, min_cpus, max_cpus, current_cpus) = row
-            elastic_str = ""
-            if is_elastic:
-                if current_cpus:
-                    elastic_str = f"{current_cpus}/{max_cpus}"
-                else:
-                    elastic_str = f"{cpus}/{max_cpus}"
-        else:  # Old format (backward compatibility)
-            (job_id, command, cpus, mem_mb, status, priority,
-             submit_time, start_time, end_time, wait_time, runtime) = row[:11]
-            elastic_str = ""
-        
-        print(
-            f"{job_id:>4} {status:>8} {cpus:>3} {mem_mb:>7} {priority:>3} "
-            f"{(wait_time or 0):>8.1f} {(runtime or 0):>8.1f} "
-            f"{elastic_str:>8} {format_ts(submit_time):>19} {command}"
-        )
+    if lines:
+        lines.append("")
+        sys.stdout.write("\n".join(lines))
 
 
 def cmd_show(args):
@@ -76,118 +117,39 @@ def cmd_show(args):
         print(f"Job {args.job_id} not found")
         return
 
-    # Handle both old and new schema (with elastic fields and topology)
-    if len(job) >= 23:  # New schema with elastic fields and nodes
-        (
-            job_id,
-            command,
-            cpus,
-            mem_mb,
-            status,
-            priority,
-            submit_time,
-            start_time,
-            end_time,
-            wait_time,
-            runtime,
-            return_code,
-            user,
-            stdout_path,
-            stderr_path,
-            cpu_user_time,
-            cpu_system_time,
-            is_elastic,
-            min_cpus,
-            max_cpus,
-            current_cpus,
-            control_file,
-            nodes,
-        ) = job
-    elif len(job) >= 22:  # Schema with elastic fields but no nodes
-        (
-            job_id,
-            command,
-            cpus,
-            mem_mb,
-            status,
-            priority,
-            submit_time,
-            start_time,
-            end_time,
-            wait_time,
-            runtime,
-            return_code,
-            user,
-            stdout_path,
-            stderr_path,
-            cpu_user_time,
-            cpu_system_time,
-            is_elastic,
-            min_cpus,
-            max_cpus,
-            current_cpus,
-            control_file,
-        ) = job
-        nodes = None
-    else:  # Old schema (backward compatibility)
-        (
-            job_id,
-            command,
-            cpus,
-            mem_mb,
-            status,
-            priority,
-            submit_time,
-            start_time,
-            end_time,
-            wait_time,
-            runtime,
-            return_code,
-            user,
-            stdout_path,
-            stderr_path,
-            cpu_user_time,
-            cpu_system_time,
-        ) = job[:17]
-        is_elastic = False
-        min_cpus = None
-        max_cpus = None
-        current_cpus = None
-        control_file = None
-        nodes = None
-
-    print(f"Job {job_id}")
-    print(f"  User:        {user}")
-    print(f"  Status:      {status}")
-    print(f"  Priority:    {priority}")
-    print(f"  Command:     {command}")
-    if is_elastic:
-        print(f"  Type:        ELASTIC")
-        print(f"  CPUs:        {cpus} (current: {current_cpus or cpus}, min: {min_cpus}, max: {max_cpus})")
+    lines = [f"Job {job['id']}"]
+    lines.append(f"  User:        {job['user']}")
+    lines.append(f"  Status:      {job['status']}")
+    lines.append(f"  Priority:    {job['priority']}")
+    lines.append(f"  Command:     {job['command']}")
+    if job['is_elastic']:
+        lines.append(f"  Type:        ELASTIC")
+        lines.append(f"  CPUs:        {job['cpus']} (current: {job['current_cpus'] or job['cpus']}, min: {job['min_cpus']}, max: {job['max_cpus']})")
     else:
-        print(f"  CPUs:        {cpus}")
-    print(f"  Mem (MB):    {mem_mb}")
+        lines.append(f"  CPUs:        {job['cpus']}")
+    lines.append(f"  Mem (MB):    {job['mem_mb']}")
+    nodes = job['nodes']
     if nodes:
         try:
-            nodes_list = json.loads(nodes) if isinstance(nodes, str) else nodes
-            print(f"  Nodes:       {','.join(nodes_list)}")
+            nodes_list = _json_decode(nodes) if isinstance(nodes, str) else nodes
+            lines.append(f"  Nodes:       {','.join(nodes_list)}")
         except (json.JSONDecodeError, TypeError):
-            if nodes:
-                print(f"  Nodes:       {nodes}")
-    print(f"  Submitted:   {format_ts(submit_time)}")
-    print(f"  Started:     {format_ts(start_time)}")
-    print(f"  Ended:       {format_ts(end_time)}")
-    print(f"  Wait time:   {wait_time:.2f}s" if wait_time else "  Wait time:   -")
-    print(f"  Runtime:     {runtime:.2f}s" if runtime else "  Runtime:     -")
-    print(f"  Return code: {return_code}")
-    print(f"  Stdout:      {stdout_path}")
-    print(f"  Stderr:      {stderr_path}")
-    if cpu_user_time is not None:
-        print(f"  CPU user:    {cpu_user_time:.2f}s")
-    if cpu_system_time is not None:
-        print(f"  CPU system:  {cpu_system_time:.2f}s")
-    if control_file:
-        print(f"  Control:     {control_file}")
+            lines.append(f"  Nodes:       {nodes}")
+    lines.append(f"  Submitted:   {format_ts(job['submit_time'])}")
+    lines.append(f"  Started:     {format_ts(job['start_time'])}")
+    lines.append(f"  Ended:       {format_ts(job['end_time'])}")
+    lines.append(f"  Wait time:   {job['wait_time']:.2f}s" if job['wait_time'] else "  Wait time:   -")
+    lines.append(f"  Runtime:     {job['runtime']:.2f}s" if job['runtime'] else "  Runtime:     -")
+    lines.append(f"  Return code: {job['return_code']}")
+    lines.append(f"  Stdout:      {job['stdout_path']}")
+    lines.append(f"  Stderr:      {job['stderr_path']}")
+    if job['cpu_user_time'] is not None:
+        lines.append(f"  CPU user:    {job['cpu_user_time']:.2f}s")
+    if job['cpu_system_time'] is not None:
+        lines.append(f"  CPU system:  {job['cpu_system_time']:.2f}s")
+    if job['control_file']:
+        lines.append(f"  Control:     {job['control_file']}")
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 def cmd_cancel(args):
@@ -209,70 +171,91 @@ def cmd_scheduler(args):
     ms.scheduler_loop(
         poll_interval=args.poll_interval,
         elastic_scale_threshold=args.elastic_threshold,
-        enable_elastic_scaling=not args.disable_elastic
+        enable_elastic_scaling=not args.disable_elastic,
+        elastic_rescale_gap=args.rescale_gap,
     )
 
 
+# Fixed top of the `stats` report; the rest depends on which figures exist
+_STATS_RESOURCES = """\
+============================================================
+Mini-SLURM Statistics
+============================================================
+
+System Resources:
+  Total CPUs:     %s
+  Used CPUs:      %s (%.1f%%)
+  Available CPUs: %s
+  Total Memory:   %.0f MB (%.1f GB)
+  Used Memory:    %.0f MB (%.1f%%)
+  Available Mem:  %.0f MB"""
+
+
 def cmd_stats(args):
     ms = MiniSlurm(
         total_cpus=args.total_cpus,
         total_mem_mb=parse_mem(args.total_mem) if args.total_mem else None,
     )
     stats = ms.get_stats()
-    
-    print("=" * 60)
-    print("Mini-SLURM Statistics")
-    print("=" * 60)
-    print()
-    
-    # System Resources
-    print("System Resources:")
-    print(f"  Total CPUs:     {stats['total_cpus']}")
-    print(f"  Used CPUs:      {stats['used_cpus']} ({stats['used_cpus']/stats['total_cpus']*100:.1f}%)")
-    print(f"  Available CPUs: {stats['total_cpus'] - stats['used_cpus']}")
-    print(f"  Total Memory:   {stats['total_mem_mb']:.0f} MB ({stats['total_mem_mb']/1024:.1f} GB)")
-    print(f"  Used Memory:    {stats['used_mem_mb']:.0f} MB ({stats['used_mem_mb']/stats['total_mem_mb']*100:.1f}%)")
-    print(f"  Available Mem:  {stats['total_mem_mb'] - stats['used_mem_mb']:.0f} MB")
-    if stats['cpu_percent'] is not None:
-        print(f"  System CPU %:   {stats['cpu_percent']:.1f}%")
-    if stats['mem_percent'] is not None:
-        print(f"  System Mem %:   {stats['mem_percent']:.1f}%")
-    print()
+
+    # Collect the report and write it once rather than one print() per line
+    total_cpus = stats['total_cpus']
+    used_cpus = stats['used_cpus']
+    total_mem = stats['total_mem_mb']
+    used_mem = stats['used_mem_mb']
+    lines = [_STATS_RESOURCES % (
+        total_cpus,
+        used_cpus, used_cpus / total_cpus * 100,
+        total_cpus - used_cpus,
+        total_mem, total_mem / 1024,
+        used_mem, used_mem / total_mem * 100,
+        total_mem - used_mem,
+    )]
+    cpu_percent = stats['cpu_percent']
+    mem_percent = stats['mem_percent']
+    if cpu_percent is not None:
+        lines.append(f"  System CPU %:   {cpu_percent:.1f}%")
+    if mem_percent is not None:
+        lines.append(f"  System Mem %:   {mem_percent:.1f}%")
+    lines.append("")
     
     # Job Statistics
-    print("Job Statistics:")
-    print(f"  Total Jobs:     {stats['total_jobs']}")
-    print(f"  Running:        {stats['running_count']}")
-    print(f"  Pending:        {stats['pending_count']}")
+    total_jobs = stats['total_jobs']
+    status_counts = stats['status_counts']
+    lines.append("Job Statistics:")
+    lines.append(f"  Total Jobs:     {total_jobs}")
+    lines.append(f"  Running:        {stats['running_count']}")
+    lines.append(f"  Pending:        {stats['pending_count']}")
     for status in ['COMPLETED', 'FAILED', 'CANCELLED']:
-        count = stats['status_counts'].get(status, 0)
+        count = status_counts.get(status, 0)
         if count > 0:
-            print(f"  {status:12} {count}")
-    print()
+            lines.append(f"  {status:12} {count}")
+    lines.append("")
     
     # Performance Metrics
     if stats['completed_count'] > 0:
-        print("Performance Metrics (completed jobs):")
-        print(f"  Average Wait Time:  {stats['avg_wait_time']:.2f} seconds")
-        print(f"  Average Runtime:    {stats['avg_runtime']:.2f} seconds")
-        print()
+        lines.append("Performance Metrics (completed jobs):")
+        lines.append(f"  Average Wait Time:  {stats['avg_wait_time']:.2f} seconds")
+        lines.append(f"  Average Runtime:    {stats['avg_runtime']:.2f} seconds")
+        lines.append("")
     
     # Status Breakdown
-    if stats['status_counts']:
-        print("Status Breakdown:")
-        for status, count in sorted(stats['status_counts'].items()):
-            percentage = (count / stats['total_jobs'] * 100) if stats['total_jobs'] > 0 else 0
-            print(f"  {status:12} {count:4} ({percentage:5.1f}%)")
+    if status_counts:
+        lines.append("Status Breakdown:")
+        for status, count in sorted(status_counts.items()):
+            percentage = (count / total_jobs * 100) if total_jobs > 0 else 0
+            lines.append(f"  {status:12} {count:4} ({percentage:5.1f}%)")
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
-def build_parser():
-    parser = argparse.ArgumentParser(
-        prog="mini-slurm",
-        description="Mini-SLURM: a tiny local HPC-style job scheduler",
-    )
-    sub = parser.add_subparsers(dest="command", required=True)
+def _env_pair(value):
+    key, sep, val = value.partition("=")
+    if not sep or not key.isidentifier():
+        raise argparse.ArgumentTypeError(f"expected KEY=VALUE, got {value!r}")
+    return key, val
+
 
-    # submit
+def _add_submit_parser(sub):
     p_submit = sub.add_parser("submit", help="Submit a job")
     p_submit.add_argument("--cpus", type=int, required=True, help="CPUs required (initial for elastic jobs)")
     p_submit.add_argument("--mem", type=str, required=True, help="Memory (e.g. 8GB, 1024MB)")
@@ -280,26 +263,35 @@ def build_parser():
     p_submit.add_argument("--elastic", action="store_true", help="Enable elastic scaling for this job")
     p_submit.add_argument("--min-cpus", type=int, help="Minimum CPUs for elastic job (default: initial cpus)")
     p_submit.add_argument("--max-cpus", type=int, help="Maximum CPUs for elastic job (default: total system CPUs)")
-    p_submit.add_argument("command", nargs=argparse.REMAINDER, help="Command to run")
-    p_submit.set_defaults(func=cmd_submit)
+    p_submit.add_argument("--env", action="append", type=_env_pair, default=[], metavar="KEY=VALUE",
+                          help="Set an environment variable for the job (repeatable)")
+    # dest differs from the metavar so it can't clobber the subcommand name
+    p_submit.add_argument("job_command", metavar="command", nargs=argparse.REMAINDER,
+                          help="Command to run")
+
+
+def _add_batch_submit_parser(sub):
+    p_batch = sub.add_parser("batch-submit", help="Submit all jobs from a JSON manifest")
+    p_batch.add_argument("manifest", help="Path to a JSON list of jobs, or - to read from stdin")
+
 
-    # queue
+def _add_queue_parser(sub):
     p_queue = sub.add_parser("queue", help="Show job queue")
     p_queue.add_argument("--status", choices=["PENDING", "RUNNING", "COMPLETED", "FAILED", "CANCELLED"],
                          help="Filter by status")
-    p_queue.set_defaults(func=cmd_queue)
 
-    # show
+
+def _add_show_parser(sub):
     p_show = sub.add_parser("show", help="Show job details")
     p_show.add_argument("job_id", type=int)
-    p_show.set_defaults(func=cmd_show)
 
-    # cancel
+
+def _add_cancel_parser(sub):
     p_cancel = sub.add_parser("cancel", help="Cancel a pending job")
     p_cancel.add_argument("job_id", type=int)
-    p_cancel.set_defaults(func=cmd_cancel)
 
-    # scheduler
+
+def _add_scheduler_parser(sub):
     p_sched = sub.add_parser("scheduler", help="Run the scheduler loop")
     p_sched.add_argument("--total-cpus", type=int, help="Override detected total CPUs")
     p_sched.add_argument("--total-mem", type=str, help="Override total memory (e.g. 16GB)")
@@ -308,23 +300,69 @@ def build_parser():
                         help="Cluster utilization threshold for elastic scaling (default: 50%%)")
     p_sched.add_argument("--disable-elastic", action="store_true", 
                         help="Disable elastic job scaling")
+    p_sched.add_argument("--rescale-gap", type=float, default=ELASTIC_RESCALE_GAP,
+                        help="Minimum seconds before a rescaled elastic job can scale up again "
+                             f"(default: {ELASTIC_RESCALE_GAP:g})")
     p_sched.add_argument("--topology-config", type=str, 
                         help="Path to topology configuration file (default: ~/.mini_slurm_topology.conf)")
-    p_sched.set_defaults(func=cmd_scheduler)
 
-    # stats
+
+def _add_stats_parser(sub):
     p_stats = sub.add_parser("stats", help="Show system statistics and job metrics")
     p_stats.add_argument("--total-cpus", type=int, help="Override detected total CPUs")
     p_stats.add_argument("--total-mem", type=str, help="Override total memory (e.g. 16GB)")
-    p_stats.set_defaults(func=cmd_stats)
 
+
+# Subcommand name -> handler
+_COMMANDS = {
+    "submit": cmd_submit,
+    "batch-submit": cmd_batch_submit,
+    "queue": cmd_queue,
+    "show": cmd_show,
+    "cancel": cmd_cancel,
+    "scheduler": cmd_scheduler,
+    "stats": cmd_stats,
+}
+
+# Subcommand name -> function adding its parser, in help-listing order
+_SUBPARSERS = {
+    "submit": _add_submit_parser,
+    "batch-submit": _add_batch_submit_parser,
+    "queue": _add_queue_parser,
+    "show": _add_show_parser,
+    "cancel": _add_cancel_parser,
+    "scheduler": _add_scheduler_parser,
+    "stats": _add_stats_parser,
+}
+
+
+@lru_cache(maxsize=None)
+def build_parser(command: Optional[str] = None):
+    """
+    Build the CLI parser. If `command` names a subcommand, only that
+    subparser is built, which is all parse_args() needs for it.
+
+    Parsers are cached per `command`, so repeated in-process calls (tests,
+    embedding) reuse them; don't modify the returned parser.
+    """
+    parser = argparse.ArgumentParser(
+        prog="mini-slurm",
+        description="Mini-SLURM: a tiny local HPC-style job scheduler",
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+    if command in _SUBPARSERS:
+        _SUBPARSERS[command](sub)
+    else:
+        for add_parser in _SUBPARSERS.values():
+            add_parser(sub)
     return parser
 
 
 def main():
-    parser = build_parser()
+    # Top-level --help, typos etc. get the full parser
+    parser = build_parser(sys.argv[1] if len(sys.argv) > 1 else None)
     args = parser.parse_args()
-    args.func(args)
+    _COMMANDS[args.command](args)
 
 
 if __name__ == "__main__":
@@ -8,35 +8,71 @@ import time
 from pathlib import Path
 import resource
 import platform
+import queue
+import heapq
 import json
 import re
-from typing import Dict, List, Set, Optional
+import shlex
+import sqlite3
+import selectors
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Dict, List, Set, Optional, Tuple
 from collections import defaultdict
 
-# Optional: CPU usage logging
+# Optional: system-wide CPU/memory figures in get_stats()
 try:
     import psutil
 except ImportError:  # psutil is optional
     psutil = None
 
-from .database import init_db, get_conn
+from .database import get_conn, init_db, open_persistent_conn, tune_scheduler_conn
 from .utils import current_user
 
 LOG_DIR = os.path.expanduser("~/.mini_slurm_logs")
+# Number of pre-opened stdout/stderr file pairs kept ready for job launches
+LOG_POOL_SIZE = 4
+# Most queued submit_job() calls the writer thread commits in one transaction
+SUBMIT_BATCH_SIZE = 64
+# Default minimum seconds before a rescaled elastic job can scale up again
+ELASTIC_RESCALE_GAP = 30.0
 TOPOLOGY_CONFIG_PATH = os.path.expanduser("~/.mini_slurm_topology.conf")
 
+# Patterns used by the topology parser and job launch.
+# _RE_CONF matches both topology.conf line kinds; lastgroup tells them apart:
+#   SwitchName=switch1 Nodes=node[1-4]  /  SwitchName=core1 Switches=switch[1-2]
+#   TopologyPlugin=topology/tree
+_RE_CONF = re.compile(
+    r'SwitchName=(?P<switch>\S+)\s+(?P<kind>Nodes|Switches)=(?P<targets>.+)'
+    r'|TopologyPlugin=(?P<plugin>.*)'
+)
+_RE_RANGE = re.compile(r'(\w+)\[(\d+)-(\d+)\]')
+_RE_NODE = re.compile(r'node(\d+)')
+_RE_POOL_FILE = re.compile(r'\.pool_(\d+)_\d+\.(?:out|err)$')
+
 
 class TopologyConfig:
     """
     Represents the network topology configuration.
     Similar to SLURM's topology plugin configuration.
     """
+    __slots__ = ('enabled', 'switches', 'node_to_switch', 'switch_hierarchy', 'nodes',
+                 'total_cpus_per_node', 'total_mem_per_node',
+                 '_path_cache', '_distance_cache', '_switch_members')
+    
     def __init__(self):
         self.enabled = False
         self.switches: Dict[str, Dict] = {}  # switch_name -> {type, parent, children}
         self.node_to_switch: Dict[str, str] = {}  # node_name -> leaf_switch_name
         self.switch_hierarchy: Dict[str, List[str]] = defaultdict(list)  # parent -> [children]
         self.nodes: Dict[str, Dict] = {}  # node_name -> {cpus, mem_mb, switch}
+        # Resources assumed for nodes whose entry doesn't list its own
+        self.total_cpus_per_node = 1
+        self.total_mem_per_node = 1024
+        self._path_cache: Dict[str, Tuple[str, ...]] = {}  # switch -> _get_switch_path()
+        self._distance_cache: Dict[Tuple[str, str], int] = {}  # (switch, switch) -> hops
+        self._switch_members: Optional[Dict[str, List[str]]] = None  # leaf switch -> [nodes]
     
     def load_from_file(self, config_path: str):
         """Load topology configuration from a file (similar to slurm.conf format)."""
@@ -49,71 +85,74 @@ class TopologyConfig:
         with open(config_path, 'r') as f:
             for line in f:
                 line = line.strip()
-                # Skip comments and empty lines
-                if not line or line.startswith('#'):
+                # Comments, blanks and other keys simply don't match
+                match = _RE_CONF.match(line)
+                if match is None:
                     continue
-                
-                # Parse key=value pairs
-                if '=' in line:
-                    key, value = line.split('=', 1)
-                    key = key.strip()
-                    value = value.strip()
+                if match.lastgroup == 'plugin':
+                    value = match.group('plugin').strip()
+                    self.enabled = value.lower() in ('topology/tree', 'topology', 'yes', '1', 'true')
+                else:
+                    switch_name = match.group('switch')
+                    link_type = match.group('kind')
+                    targets = match.group('targets')
+                    
+                    if switch_name not in self.switches:
+                        self.switches[switch_name] = {'type': 'leaf', 'parent': None, 'children': []}
                     
-                    if key == 'TopologyPlugin':
-                        self.enabled = value.lower() in ('topology/tree', 'topology', 'yes', '1', 'true')
-                    elif key.startswith('SwitchName='):
-                        # Format: SwitchName=switch1 Nodes=node[1-4]
-                        # or: SwitchName=switch1 Switches=switch[1-2]
-                        match = re.match(r'SwitchName=(\S+)\s+(Nodes|Switches)=(.+)', line)
-                        if match:
-                            switch_name = match.group(1)
-                            link_type = match.group(2)
-                            targets = match.group(3)
-                            
-                            if switch_name not in self.switches:
-                                self.switches[switch_name] = {'type': 'leaf', 'parent': None, 'children': []}
-                            
-                            # Parse node/switch ranges (e.g., "node[1-4]" or "switch[1-2]")
-                            targets_list = self._parse_range(targets)
-                            
-                            if link_type == 'Nodes':
-                                for target in targets_list:
-                                    self.node_to_switch[target] = switch_name
-                                    if target not in self.nodes:
-                                        self.nodes[target] = {'switch': switch_name}
-                            elif link_type == 'Switches':
-                                # This is a parent switch
-                                self.switches[switch_name]['type'] = 'core'
-                                for child_switch in targets_list:
-                                    if child_switch in self.switches:
-                                        self.switches[child_switch]['parent'] = switch_name
-                                        self.switches[switch_name]['children'].append(child_switch)
-                                    else:
-                                        # Create child switch if it doesn't exist
-                                        self.switches[child_switch] = {
-                                            'type': 'leaf',
-                                            'parent': switch_name,
-                                            'children': []
-                                        }
-                                        self.switches[switch_name]['children'].append(child_switch)
+                    # Parse node/switch ranges (e.g., "node[1-4]" or "switch[1-2]")
+                    targets_list = self._parse_range(targets)
+                    
+                    if link_type == 'Nodes':
+                        for target in targets_list:
+                            self.node_to_switch[target] = switch_name
+                            if target not in self.nodes:
+                                self.nodes[target] = {'switch': switch_name}
+                    elif link_type == 'Switches':
+                        # This is a parent switch
+                        self.switches[switch_name]['type'] = 'core'
+                        for child_switch in targets_list:
+                            if child_switch in self.switches:
+                                self.switches[child_switch]['parent'] = switch_name
+                                self.switches[switch_name]['children'].append(child_switch)
+                            else:
+                                # Create child switch if it doesn't exist
+                                self.switches[child_switch] = {
+                                    'type': 'leaf',
+                                    'parent': switch_name,
+                                    'children': []
+                                }
+                                self.switches[switch_name]['children'].append(child_switch)
         
+        self.clear_caches()
         return True
+
+    def clear_caches(self):
+        """Drop derived data; call after changing switches or nodes directly."""
+        self._path_cache.clear()
+        self._distance_cache.clear()
+        self._switch_members = None
+    
+    def _get_switch_members(self) -> Dict[str, List[str]]:
+        """Map each leaf switch to its nodes, in node order (built once per topology)."""
+        if self._switch_members is None:
+            members = defaultdict(list)
+            for node in self.nodes:
+                switch = self.node_to_switch.get(node)
+                if switch:
+                    members[switch].append(node)
+            self._switch_members = dict(members)
+        return self._switch_members
     
     def _parse_range(self, range_str: str) -> List[str]:
         """Parse range strings like 'node[1-4]' or 'switch[1-2]' into list of names."""
-        result = []
         # Match patterns like "node[1-4]" or "node1,node2,node3"
-        range_match = re.match(r'(\w+)\[(\d+)-(\d+)\]', range_str)
+        range_match = _RE_RANGE.match(range_str)
         if range_match:
-            prefix = range_match.group(1)
-            start = int(range_match.group(2))
-            end = int(range_match.group(3))
-            for i in range(start, end + 1):
-                result.append(f"{prefix}{i}")
-        else:
-            # Comma-separated list
-            result = [s.strip() for s in range_str.split(',')]
-        return result
+            prefix, start, end = range_match.groups()
+            return [f"{prefix}{i}" for i in range(int(start), int(end) + 1)]
+        # Comma-separated list
+        return [s.strip() for s in range_str.split(',')]
     
     def get_node_distance(self, node1: str, node2: str) -> int:
         """
@@ -132,6 +171,12 @@ class TopologyConfig:
         if switch1 == switch2:
             return 0  # Same leaf switch
         
+        # There are few leaf switches, so remember each pair's distance
+        key = (switch1, switch2) if switch1 < switch2 else (switch2, switch1)
+        distance = self._distance_cache.get(key)
+        if distance is not None:
+            return distance
+        
         # Find common ancestor
         path1 = self._get_switch_path(switch1)
         path2 = self._get_switch_path(switch2)
@@ -146,18 +191,22 @@ class TopologyConfig:
         
         # Distance is sum of hops from each node to LCA
         distance = (len(path1) - common_depth) + (len(path2) - common_depth)
+        self._distance_cache[key] = distance
         return distance
     
-    def _get_switch_path(self, switch_name: str) -> List[str]:
-        """Get the path from root to this switch."""
+    def _get_switch_path(self, switch_name: str) -> Tuple[str, ...]:
+        """Get the path from root to this switch (cached; the tree is static)."""
+        path = self._path_cache.get(switch_name)
+        if path is not None:
+            return path
         path = []
         current = switch_name
         while current:
-            path.insert(0, current)
-            if current in self.switches and self.switches[current]['parent']:
-                current = self.switches[current]['parent']
-            else:
-                break
+            path.append(current)
+            switch = self.switches.get(current)
+            current = switch['parent'] if switch else None
+        path = tuple(reversed(path))
+        self._path_cache[switch_name] = path
         return path
     
     def find_best_nodes(self, num_nodes: int, cpus_per_node: int, 
@@ -167,8 +216,8 @@ class TopologyConfig:
         Returns None if not enough nodes available.
         """
         available_nodes = []
-        default_cpus = getattr(self, 'total_cpus_per_node', 1)
-        default_mem = getattr(self, 'total_mem_per_node', 1024)
+        default_cpus = self.total_cpus_per_node
+        default_mem = self.total_mem_per_node
         for node_name, node_info in self.nodes.items():
             if node_name not in used_nodes:
                 # Check if node has enough resources
@@ -180,68 +229,258 @@ class TopologyConfig:
         if len(available_nodes) < num_nodes:
             return None
         
-        # Try to find nodes on the same leaf switch first
-        switch_to_nodes = defaultdict(list)
-        for node in available_nodes:
-            switch = self.node_to_switch.get(node)
-            if switch:
-                switch_to_nodes[switch].append(node)
+        # Every node hangs off the same switch (e.g. the default topology on
+        # a machine with <= 4 CPUs): any free nodes are equally close
+        switch_members = self._get_switch_members()
+        if len(switch_members) <= 1 and sum(map(len, switch_members.values())) == len(self.nodes):
+            return available_nodes[:num_nodes]
         
-        # Find switches with enough nodes
-        for switch, nodes in switch_to_nodes.items():
+        # Try to find nodes on the same leaf switch first
+        available_set = set(available_nodes)
+        for members in switch_members.values():
+            if len(members) < num_nodes:
+                continue
+            nodes = [n for n in members if n in available_set]
             if len(nodes) >= num_nodes:
                 return nodes[:num_nodes]
         
-        # If not possible, find nodes that minimize maximum distance
-        # Use a greedy approach: start with one node, add closest nodes
-        if available_nodes:
-            selected = [available_nodes[0]]
-            remaining = set(available_nodes[1:])
-            
-            while len(selected) < num_nodes and remaining:
-                # Find the node closest to any selected node
-                best_node = None
-                best_distance = float('inf')
-                
-                for candidate in remaining:
-                    min_dist_to_selected = min(
-                        self.get_node_distance(candidate, sel) 
-                        for sel in selected
-                    )
-                    if min_dist_to_selected < best_distance:
-                        best_distance = min_dist_to_selected
-                        best_node = candidate
-                
-                if best_node:
-                    selected.append(best_node)
-                    remaining.remove(best_node)
-                else:
-                    break
-            
-            if len(selected) == num_nodes:
-                return selected
+        # Otherwise use the smallest subtree (deepest common switch) that has
+        # enough free nodes, keeping each leaf switch's nodes together
+        paths = {}
+        subtree_nodes = defaultdict(list)
+        subtree_depth = {}
+        for node in available_nodes:
+            switch = self.node_to_switch.get(node)
+            if not switch:
+                continue
+            path = self._get_switch_path(switch)
+            paths[node] = path
+            for depth, ancestor in enumerate(path[:-1]):
+                subtree_nodes[ancestor].append(node)
+                subtree_depth[ancestor] = depth
         
+        best = None
+        for ancestor, nodes in subtree_nodes.items():
+            if len(nodes) >= num_nodes and (best is None or subtree_depth[ancestor] > subtree_depth[best]):
+                best = ancestor
+        if best is not None:
+            return sorted(subtree_nodes[best], key=paths.__getitem__)[:num_nodes]
+        
+        # No single switch spans enough free nodes: take them in topology order
+        ordered = sorted(available_nodes, key=lambda n: (n not in paths, paths.get(n, ())))
+        return ordered[:num_nodes]
+
+
+def _exit_code(status: int) -> int:
+    """Translate a raw wait status into a Popen-style return code."""
+    if hasattr(os, "waitstatus_to_exitcode"):  # Python 3.9+
+        return os.waitstatus_to_exitcode(status)
+    if os.WIFSIGNALED(status):
+        return -os.WTERMSIG(status)
+    return os.WEXITSTATUS(status)
+
+
+def _elastic_gain(cpus: int, min_cpus: int) -> float:
+    """
+    Value gained by growing an elastic job from `cpus` to `cpus + 1` CPUs.
+
+    A job's value is taken as w / (w + min_cpus) for w CPUs above its
+    minimum, i.e. 1 - min_cpus / cpus: each extra CPU is worth less than the
+    one before, the usual diminishing return of adding workers.
+    """
+    return min_cpus / (cpus * (cpus + 1)) if cpus > 0 else float('inf')
+
+
+def _write_control_file(path: str, cpus: int, mem_mb: int, min_cpus: int,
+                        max_cpus: int, scale_event: Optional[float] = None):
+    """
+    Write an elastic job's control file in one os.write() to a temp file that
+    then replaces it, so the job never reads a half-written file.
+    """
+    payload = (f"CPUS={cpus}\nMEM_MB={mem_mb}\nMIN_CPUS={min_cpus}\n"
+               f"MAX_CPUS={max_cpus}\nSTATUS=RUNNING\n")
+    if scale_event is not None:
+        payload += f"SCALE_EVENT={scale_event}\n"
+    tmp_path = f"{path}.tmp"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.write(fd, payload.encode())
+    finally:
+        os.close(fd)
+    os.replace(tmp_path, path)
+
+
+# Characters that need a real shell: expansion, redirection, pipelines, ...
+_SHELL_METACHARS = frozenset(';|&$`<>(){}[]*?~!#\\\n')
+_ENV_ASSIGNMENT = re.compile(r'[A-Za-z_][A-Za-z0-9_]*=')
+
+
+def _split_simple_command(command: str):
+    """
+    Split a command that uses no shell features into (env, argv), moving any
+    leading KEY=VALUE assignments into env. Returns None if it needs /bin/sh.
+    """
+    if any(ch in _SHELL_METACHARS for ch in command):
+        return None
+    try:
+        words = shlex.split(command)
+    except ValueError:
         return None
+    env = {}
+    while words and _ENV_ASSIGNMENT.match(words[0]):
+        key, _, value = words.pop(0).partition("=")
+        env[key] = value
+    if not words:
+        return None
+    return env, words
+
+
+# SQL used by MiniSlurm, kept as constants so each statement text is shared
+# and stays hot in the connection's prepared-statement cache
+_SQL_INSERT_JOB = """
+    INSERT INTO jobs (command, cpus, mem_mb, status, priority,
+                      submit_time, user, is_elastic, min_cpus, max_cpus, current_cpus)
+    VALUES (:command, :cpus, :mem_mb, 'PENDING', :priority, :submit_time, :user,
+            :is_elastic, :min_cpus, :max_cpus, :current_cpus)
+"""
+_SQL_LIST_JOBS_BY_STATUS = """
+    SELECT id, command, cpus, mem_mb, status, priority,
+           submit_time, start_time, end_time, wait_time, runtime,
+           is_elastic, min_cpus, max_cpus, current_cpus
+    FROM jobs
+    WHERE status = :status
+    ORDER BY submit_time ASC, id ASC
+"""
+_SQL_LIST_JOBS = """
+    SELECT id, command, cpus, mem_mb, status, priority,
+           submit_time, start_time, end_time, wait_time, runtime,
+           is_elastic, min_cpus, max_cpus, current_cpus
+    FROM jobs
+    ORDER BY submit_time ASC, id ASC
+"""
+_SQL_GET_JOB = "SELECT * FROM jobs WHERE id = :job_id"
+_SQL_JOB_STATUS = "SELECT status FROM jobs WHERE id = :job_id"
+_SQL_CANCEL = "UPDATE jobs SET status = 'CANCELLED' WHERE id = :job_id"
+_SQL_PENDING = """
+    SELECT id, command, cpus, mem_mb, priority, is_elastic, min_cpus, max_cpus,
+           submit_time
+    FROM jobs
+    WHERE status = 'PENDING'
+    ORDER BY priority DESC, submit_time ASC, id ASC
+"""
+_SQL_RUNNING_ELASTIC = """
+    SELECT id, current_cpus, min_cpus, max_cpus, priority, control_file
+    FROM jobs
+    WHERE status = 'RUNNING' AND is_elastic = 1
+    ORDER BY priority ASC, submit_time ASC
+"""
+_SQL_UPDATE_CPUS = """
+    UPDATE jobs
+    SET current_cpus = :new_cpus, cpus = :new_cpus
+    WHERE id = :job_id
+"""
+_SQL_SUBMIT_TIME = "SELECT submit_time FROM jobs WHERE id = :job_id"
+
+# Encoder for the JSON-encoded nodes column (same output as json.dumps)
+_json_encode = json.JSONEncoder().encode
+_SQL_START_UPDATE = """
+    UPDATE jobs
+    SET status = 'RUNNING',
+        start_time = :start_time,
+        wait_time = :wait_time,
+        stdout_path = :stdout_path,
+        stderr_path = :stderr_path,
+        control_file = :control_file,
+        current_cpus = :current_cpus,
+        nodes = :nodes
+    WHERE id = :job_id
+"""
+_SQL_COMPLETE_FAST = """
+    UPDATE jobs
+    SET status = 'COMPLETED', end_time = ?, runtime = ?, return_code = 0,
+        cpu_user_time = ?, cpu_system_time = ?
+    WHERE id = ?
+"""
+_SQL_COMPLETE_UPDATE = """
+    UPDATE jobs
+    SET status = :status,
+        end_time = :end_time,
+        runtime = :runtime,
+        return_code = :return_code,
+        cpu_user_time = :cpu_user_time,
+        cpu_system_time = :cpu_system_time
+    WHERE id = :job_id
+"""
 
 
 class MiniSlurm:
     def __init__(self, total_cpus: Optional[int] = None, total_mem_mb: Optional[int] = None,
                  topology_config_path: Optional[str] = None):
         init_db()
+        self._user = current_user()
+        # One connection for the lifetime of the instance; writes go through _transaction()
+        self.conn = open_persistent_conn()
+        # Guards self.conn and the pending-job heap
+        self._lock = threading.RLock()
+        # Pending jobs as (-priority, submit_time, job_id, row); ids no longer in
+        # _pending_ids (started or cancelled) are dropped lazily when popped
+        self._pending_heap: List[tuple] = []
+        self._pending_ids: Set[int] = set()
+        self._data_version = None
+        # Totals of cpus/mem_mb over the scheduler's running jobs, kept in step
+        # with its `running` dict
+        self._used_cpus = 0
+        self._used_mem = 0
+        # Pre-opened (fd_out, tmp_out, fd_err, tmp_err) log files, renamed into
+        # place when a job starts
+        self._log_pool: List[tuple] = []
+        self._log_seq = 0
+        # submit_job() calls waiting for the writer thread, as (params, Future)
+        self._submit_queue: "queue.Queue[tuple]" = queue.Queue()
+        self._submit_writer: Optional[threading.Thread] = None
+        # pid -> job_id for the scheduler's running jobs
+        self._pid_to_job: Dict[int, int] = {}
+        # While the scheduler's SIGCHLD handler is installed (_reap_all), exited
+        # children are reaped with one wildcard wait4 loop, and only after the
+        # handler has set _child_exited
+        self._reap_all = False
+        self._child_exited = False
+        # Self-pipe used to wake the scheduler on SIGCHLD or in-process submits
+        self._wake_r, self._wake_w = os.pipe()
+        os.set_blocking(self._wake_r, False)
+        os.set_blocking(self._wake_w, False)
         self.total_cpus = total_cpus or os.cpu_count() or 4
         self.total_mem_mb = total_mem_mb or (16 * 1024)
 
         Path(LOG_DIR).mkdir(parents=True, exist_ok=True)
         
-        # Load topology configuration
-        self.topology = TopologyConfig()
-        config_path = topology_config_path or TOPOLOGY_CONFIG_PATH
+        # Topology is loaded on first use; CLI queries like queue/show never need it
+        self._topology_config_path = topology_config_path or TOPOLOGY_CONFIG_PATH
+        self._topology: Optional[TopologyConfig] = None
+        self._node_cpus: Optional[Dict[str, Tuple[int, ...]]] = None  # node -> CPU indices
+
+    @property
+    def topology(self) -> TopologyConfig:
+        if self._topology is None:
+            self._load_topology()
+        return self._topology
+
+    def _load_topology(self):
+        """Load topology configuration, or build the default one."""
+        self._topology = TopologyConfig()
+        self._node_cpus = None
+        config_path = self._topology_config_path
         if os.path.exists(config_path):
             if self.topology.load_from_file(config_path):
                 print(f"[mini-slurm] Topology-aware scheduling enabled (config: {config_path})")
                 # Initialize node resources if not set
                 if not self.topology.nodes:
                     self._initialize_default_nodes()
+                else:
+                    # Config files only describe wiring; size each node as a
+                    # 1-CPU virtual node with an even share of memory
+                    self.topology.total_cpus_per_node = 1
+                    self.topology.total_mem_per_node = self.total_mem_mb // len(self.topology.nodes)
             else:
                 print(f"[mini-slurm] Warning: Failed to load topology config from {config_path}")
         else:
@@ -255,50 +494,80 @@ class MiniSlurm:
         nodes_per_switch = 4
         num_nodes = self.total_cpus
         num_switches = (num_nodes + nodes_per_switch - 1) // nodes_per_switch
+        mem_per_node = self.total_mem_mb // num_nodes
+        topo = self.topology
         
-        for i in range(num_nodes):
-            node_name = f"node{i+1}"
-            switch_name = f"switch{(i // nodes_per_switch) + 1}"
-            self.topology.nodes[node_name] = {
-                'cpus': 1,
-                'mem_mb': self.total_mem_mb // num_nodes,
-                'switch': switch_name
-            }
-            self.topology.node_to_switch[node_name] = switch_name
-            
-            if switch_name not in self.topology.switches:
-                self.topology.switches[switch_name] = {
-                    'type': 'leaf',
-                    'parent': None,
-                    'children': []
-                }
+        switch_names = [f"switch{i+1}" for i in range(num_switches)]
+        node_to_switch = {
+            f"node{i+1}": switch_names[i // nodes_per_switch] for i in range(num_nodes)
+        }
+        topo.node_to_switch.update(node_to_switch)
+        topo.nodes.update(
+            (node_name, {'cpus': 1, 'mem_mb': mem_per_node, 'switch': switch_name})
+            for node_name, switch_name in node_to_switch.items()
+        )
+        for switch_name in switch_names:
+            if switch_name not in topo.switches:
+                topo.switches[switch_name] = {'type': 'leaf', 'parent': None, 'children': []}
         
         # If we have multiple switches, create a core switch
         if num_switches > 1:
-            core_switch = "core1"
-            self.topology.switches[core_switch] = {
-                'type': 'core',
-                'parent': None,
-                'children': []
-            }
-            for i in range(num_switches):
-                leaf_switch = f"switch{i+1}"
-                if leaf_switch in self.topology.switches:
-                    self.topology.switches[leaf_switch]['parent'] = core_switch
-                    self.topology.switches[core_switch]['children'].append(leaf_switch)
-        
-        self.topology.total_cpus_per_node = 1
-        self.topology.total_mem_per_node = self.total_mem_mb // num_nodes
-        self.topology.enabled = True
+            topo.switches["core1"] = {'type': 'core', 'parent': None, 'children': switch_names}
+            for switch_name in switch_names:
+                topo.switches[switch_name]['parent'] = "core1"
+        
+        topo.total_cpus_per_node = 1
+        topo.total_mem_per_node = mem_per_node
+        topo.enabled = True
+        topo.clear_caches()
+
+    @contextmanager
+    def _transaction(self):
+        """
+        Run a block inside one BEGIN IMMEDIATE ... COMMIT on self.conn.
+        Nested blocks join the outer transaction.
+        """
+        with self._lock:
+            if self.conn.in_transaction:
+                yield self.conn
+                return
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.conn
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+
+    def _wake(self, *_):
+        """Wake the scheduler loop; safe to call from a signal handler."""
+        try:
+            os.write(self._wake_w, b"\0")
+        except (BlockingIOError, OSError):
+            pass  # pipe full: a wakeup is already pending
+
+    def _on_sigchld(self, *_):
+        """SIGCHLD handler: flag that children need reaping and wake the loop."""
+        self._child_exited = True
+        self._wake()
+
+    def _drain_wakeups(self):
+        try:
+            while os.read(self._wake_r, 4096):
+                pass
+        except (BlockingIOError, OSError):
+            pass
 
     # ---------- JOB SUBMISSION & QUERY ---------- #
 
-    def submit_job(self, cpus: int, mem_mb: int, command: str, priority: int = 0,
-                   is_elastic: bool = False, min_cpus: Optional[int] = None,
-                   max_cpus: Optional[int] = None) -> int:
+    def _job_params(self, submit_time: float, cpus: int, mem_mb: int, command: str,
+                    priority: int = 0, is_elastic: bool = False, min_cpus: Optional[int] = None,
+                    max_cpus: Optional[int] = None) -> dict:
         """
-        Submit a job. For elastic jobs, cpus is the initial allocation.
+        Validate a job request and return the named parameters for the INSERT.
         """
+        if cpus < 1:
+            raise ValueError(f"cpus must be at least 1 (got {cpus})")
         if is_elastic:
             if min_cpus is None:
                 min_cpus = cpus
@@ -309,130 +578,176 @@ class MiniSlurm:
             if cpus < min_cpus or cpus > max_cpus:
                 raise ValueError(f"Initial cpus ({cpus}) must be between min ({min_cpus}) and max ({max_cpus})")
         
-        conn = get_conn()
-        c = conn.cursor()
-        c.execute(
-            """
-            INSERT INTO jobs (command, cpus, mem_mb, status, priority,
-                              submit_time, user, is_elastic, min_cpus, max_cpus, current_cpus)
-            VALUES (:command, :cpus, :mem_mb, 'PENDING', :priority, :submit_time, :user,
-                    :is_elastic, :min_cpus, :max_cpus, :current_cpus)
-            """,
-            {
-                'command': command,
-                'cpus': cpus,
-                'mem_mb': mem_mb,
-                'priority': priority,
-                'submit_time': time.time(),
-                'user': current_user(),
-                'is_elastic': 1 if is_elastic else 0,
-                'min_cpus': min_cpus,
-                'max_cpus': max_cpus,
-                'current_cpus': cpus if is_elastic else None,
-            },
-        )
-        job_id = c.lastrowid
-        conn.commit()
-        conn.close()
-        return job_id
+        return {
+            'command': command,
+            'cpus': cpus,
+            'mem_mb': mem_mb,
+            'priority': priority,
+            'submit_time': submit_time,
+            'user': self._user,
+            'is_elastic': 1 if is_elastic else 0,
+            'min_cpus': min_cpus,
+            'max_cpus': max_cpus,
+            'current_cpus': cpus if is_elastic else None,
+        }
+
+    def submit_job(self, cpus: int, mem_mb: int, command: str, priority: int = 0,
+                   is_elastic: bool = False, min_cpus: Optional[int] = None,
+                   max_cpus: Optional[int] = None) -> int:
+        """
+        Submit a job. For elastic jobs, cpus is the initial allocation.
+        """
+        params = self._job_params(time.time(), cpus, mem_mb, command, priority,
+                                  is_elastic, min_cpus, max_cpus)
+        # Hand the insert to the writer thread so concurrent submitters share
+        # one commit per burst instead of paying one each
+        self._ensure_submit_writer()
+        future: Future = Future()
+        self._submit_queue.put((params, future))
+        return future.result()
+
+    def submit_jobs(self, jobs: List[dict]) -> List[int]:
+        """
+        Submit several jobs in a single transaction.
+
+        Each entry takes the same keyword arguments as submit_job(). All jobs
+        are validated before anything is written, so a bad entry rejects the
+        whole batch, and they share one submit time.
+        """
+        now = time.time()
+        params = [self._job_params(now, **job) for job in jobs]
+        job_ids = self._insert_jobs(params)
+        self._wake()
+        return job_ids
+
+    def _insert_jobs(self, params: List[dict]) -> List[int]:
+        """Insert validated jobs in one transaction and queue them for dispatch."""
+        inserted = []
+        with self._lock:
+            with self._transaction() as conn:
+                for p in params:
+                    inserted.append((conn.execute(_SQL_INSERT_JOB, p).lastrowid, p))
+            # Queue only after COMMIT: a rolled-back rowid is reused by the
+            # next insert, so queuing it earlier would run a phantom command
+            # under that job's id
+            for job_id, p in inserted:
+                self._push_pending(job_id, p)
+        return [job_id for job_id, _ in inserted]
+
+    def _ensure_submit_writer(self):
+        with self._lock:
+            if self._submit_writer is None:
+                self._submit_writer = threading.Thread(
+                    target=self._submit_writer_loop, name="mini-slurm-submit", daemon=True
+                )
+                self._submit_writer.start()
 
-    def list_jobs(self, status: Optional[str] = None):
+    def _submit_writer_loop(self):
+        """
+        Group commit for submit_job(): take whatever submits are queued (up to
+        SUBMIT_BATCH_SIZE), insert them in one transaction and resolve each
+        caller's future with its job id.
+        """
+        while True:
+            batch = [self._submit_queue.get()]
+            while len(batch) < SUBMIT_BATCH_SIZE:
+                try:
+                    batch.append(self._submit_queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                results = self._insert_jobs([params for params, _ in batch])
+            except Exception as e:
+                results = [e]
+                if len(batch) > 1:
+                    # Retry one by one so a bad entry only fails its own caller
+                    results = []
+                    for params, _ in batch:
+                        try:
+                            results.extend(self._insert_jobs([params]))
+                        except Exception as e:
+                            results.append(e)
+            self._wake()
+            for (_, future), result in zip(batch, results):
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    def list_jobs(self, status: Optional[str] = None) -> sqlite3.Cursor:
+        """
+        Return a cursor over job rows in submission order. Rows are read
+        lazily as the cursor is iterated; wrap it in list() for a list.
+
+        The cursor runs on its own connection, so it only sees committed
+        rows and a partly read cursor never holds a snapshot open on
+        self.conn.
+        """
         conn = get_conn()
-        c = conn.cursor()
         if status:
-            c.execute(
-                """
-                SELECT id, command, cpus, mem_mb, status, priority,
-                       submit_time, start_time, end_time, wait_time, runtime,
-                       is_elastic, min_cpus, max_cpus, current_cpus
-                FROM jobs
-                WHERE status = :status
-                ORDER BY submit_time ASC
-                """,
-                {'status': status},
-            )
-        else:
-            c.execute(
-                """
-                SELECT id, command, cpus, mem_mb, status, priority,
-                       submit_time, start_time, end_time, wait_time, runtime,
-                       is_elastic, min_cpus, max_cpus, current_cpus
-                FROM jobs
-                ORDER BY submit_time ASC
-                """
-            )
-        rows = c.fetchall()
-        conn.close()
-        return rows
+            return conn.execute(_SQL_LIST_JOBS_BY_STATUS, {'status': status})
+        return conn.execute(_SQL_LIST_JOBS)
 
-    def get_job(self, job_id: int):
-        conn = get_conn()
-        c = conn.cursor()
-        c.execute("SELECT * FROM jobs WHERE id = :job_id", {'job_id': job_id})
-        row = c.fetchone()
-        conn.close()
-        return row
+    def get_job(self, job_id: int) -> Optional[sqlite3.Row]:
+        """Return the job's row (indexable by column name or position), or None."""
+        # Under the lock, so another thread's open transaction isn't visible
+        with self._lock:
+            cur = self.conn.cursor()
+            cur.row_factory = sqlite3.Row
+            return cur.execute(_SQL_GET_JOB, {'job_id': job_id}).fetchone()
 
     def cancel_job(self, job_id: int) -> bool:
         """
         Mark a job as CANCELLED if still pending.
         (We don't kill running processes in v0; stretch feature.)
         """
-        conn = get_conn()
-        c = conn.cursor()
-        c.execute("SELECT status FROM jobs WHERE id = :job_id", {'job_id': job_id})
-        row = c.fetchone()
-        if not row:
-            conn.close()
-            return False
-        status = row[0]
-        if status not in ("PENDING",):
-            conn.close()
-            return False
-        c.execute("UPDATE jobs SET status = 'CANCELLED' WHERE id = :job_id", {'job_id': job_id})
-        conn.commit()
-        conn.close()
+        with self._transaction() as conn:
+            row = conn.execute(_SQL_JOB_STATUS, {'job_id': job_id}).fetchone()
+            if not row:
+                return False
+            status = row[0]
+            if status not in ("PENDING",):
+                return False
+            conn.execute(_SQL_CANCEL, {'job_id': job_id})
+            self._pending_ids.discard(job_id)
         return True
 
     def get_stats(self):
         """
         Get system statistics and job metrics.
         """
-        conn = get_conn()
-        c = conn.cursor()
-        
-        # Get job counts by status
-        c.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status")
-        status_counts = dict(c.fetchall())
-        
-        # Get total jobs
-        c.execute("SELECT COUNT(*) FROM jobs")
-        total_jobs = c.fetchone()[0]
-        
-        # Get running jobs
-        c.execute("SELECT COUNT(*) FROM jobs WHERE status = 'RUNNING'")
-        running_count = c.fetchone()[0]
-        
-        # Get pending jobs
-        c.execute("SELECT COUNT(*) FROM jobs WHERE status = 'PENDING'")
-        pending_count = c.fetchone()[0]
-        
-        # Get resource usage from running jobs
-        c.execute("SELECT SUM(cpus), SUM(mem_mb) FROM jobs WHERE status = 'RUNNING'")
-        running_resources = c.fetchone()
-        used_cpus = running_resources[0] or 0
-        used_mem_mb = running_resources[1] or 0
-        
-        # Get average wait time and runtime for completed jobs
-        c.execute("""
-            SELECT AVG(wait_time), AVG(runtime), COUNT(*)
-            FROM jobs
-            WHERE status IN ('COMPLETED', 'FAILED') AND wait_time IS NOT NULL AND runtime IS NOT NULL
-        """)
-        avg_stats = c.fetchone()
-        avg_wait_time = avg_stats[0] if avg_stats[0] else 0
-        avg_runtime = avg_stats[1] if avg_stats[1] else 0
-        completed_count = avg_stats[2] or 0
+        # One pass over jobs, grouped by status; everything below is folded
+        # from these few rows instead of issuing a query per figure. Read
+        # under the lock, so another thread's open transaction isn't visible.
+        with self._lock:
+            rows = self.conn.execute("""
+                SELECT status, COUNT(*), SUM(cpus), SUM(mem_mb),
+                       SUM(CASE WHEN wait_time IS NOT NULL AND runtime IS NOT NULL THEN wait_time END),
+                       SUM(CASE WHEN wait_time IS NOT NULL AND runtime IS NOT NULL THEN runtime END),
+                       COUNT(CASE WHEN wait_time IS NOT NULL AND runtime IS NOT NULL THEN 1 END)
+                FROM jobs
+                GROUP BY status
+            """).fetchall()
+        status_counts = {}
+        total_jobs = 0
+        used_cpus = used_mem_mb = 0
+        wait_sum = runtime_sum = 0.0
+        completed_count = 0
+        for status, count, cpus, mem_mb, waits, runtimes, timed in rows:
+            status_counts[status] = count
+            total_jobs += count
+            if status == 'RUNNING':
+                used_cpus = cpus or 0
+                used_mem_mb = mem_mb or 0
+            elif status in ('COMPLETED', 'FAILED'):
+                wait_sum += waits or 0
+                runtime_sum += runtimes or 0
+                completed_count += timed
+        running_count = status_counts.get('RUNNING', 0)
+        pending_count = status_counts.get('PENDING', 0)
+        # Average wait time and runtime for completed jobs
+        avg_wait_time = wait_sum / completed_count if completed_count else 0
+        avg_runtime = runtime_sum / completed_count if completed_count else 0
         
         # Get system info
         if psutil:
@@ -447,8 +762,6 @@ class MiniSlurm:
             mem_total_mb = None
             mem_available_mb = None
         
-        conn.close()
-        
         return {
             'total_jobs': total_jobs,
             'status_counts': status_counts,
@@ -471,14 +784,19 @@ class MiniSlurm:
 
     def scheduler_loop(self, poll_interval: float = 1.0, 
                       elastic_scale_threshold: float = 50.0,
-                      enable_elastic_scaling: bool = True):
+                      enable_elastic_scaling: bool = True,
+                      elastic_rescale_gap: float = ELASTIC_RESCALE_GAP):
         """
         Main scheduler loop:
         - track running processes in memory
         - update DB on completion
         - schedule PENDING jobs when resources are available
-        - scale elastic jobs up/down based on cluster utilization
+        - scale elastic jobs up/down based on cluster utilization, scaling a
+          job up at most once every elastic_rescale_gap seconds
         """
+        # Load topology now so any config messages come before scheduling starts
+        if self._topology is None:
+            self._load_topology()
         print(
             f"[mini-slurm] Starting scheduler with "
             f"{self.total_cpus} CPUs, {self.total_mem_mb} MB memory"
@@ -486,130 +804,191 @@ class MiniSlurm:
         if enable_elastic_scaling:
             print(f"[mini-slurm] Elastic scaling enabled (threshold: {elastic_scale_threshold}% utilization)")
 
-        # job_id -> {'proc': Popen, 'ps_proc': psutil.Process | None}
+        # job_id -> {'proc': Popen, 'cpus': ..., 'mem_mb': ..., ...}
         running: dict[int, dict] = {}
+        self._pid_to_job.clear()
+        self._used_cpus = 0
+        self._used_mem = 0
+
+        # Sleep until a child exits, a job is submitted in-process, or the
+        # poll interval elapses (jobs submitted by other processes).
+        # Signal handlers can only be installed from the main thread.
+        selector = selectors.DefaultSelector()
+        selector.register(self._wake_r, selectors.EVENT_READ)
+        prev_sigchld = None
+        with self._lock:
+            tune_scheduler_conn(self.conn)
+        self._remove_stale_log_pool_files()
+        if threading.current_thread() is threading.main_thread():
+            prev_sigchld = signal.signal(signal.SIGCHLD, self._on_sigchld)
+            self._reap_all = self._child_exited = True
 
+        try:
+            self._run_scheduler(running, selector, poll_interval,
+                                elastic_scale_threshold, enable_elastic_scaling,
+                                elastic_rescale_gap)
+        finally:
+            if prev_sigchld is not None:
+                signal.signal(signal.SIGCHLD, prev_sigchld)
+                self._reap_all = False
+            selector.close()
+            self._close_log_pool()
+
+    def _run_scheduler(self, running: dict, selector: selectors.BaseSelector,
+                       poll_interval: float, elastic_scale_threshold: float,
+                       enable_elastic_scaling: bool, elastic_rescale_gap: float):
         while True:
-            # 1. Check running jobs for completion
-            self._update_running_jobs(running)
-
-            # 2. Compute available resources
-            used_cpus = sum(info["cpus"] for info in running.values())
-            used_mem = sum(info["mem_mb"] for info in running.values())
-            avail_cpus = self.total_cpus - used_cpus
-            avail_mem = self.total_mem_mb - used_mem
-
-            # 3. Elastic job scaling (before scheduling new jobs)
-            if enable_elastic_scaling:
-                self._scale_elastic_jobs(running, avail_cpus, elastic_scale_threshold)
-
-            # Recompute resources after scaling
-            used_cpus = sum(info["cpus"] for info in running.values())
-            used_mem = sum(info["mem_mb"] for info in running.values())
-            avail_cpus = self.total_cpus - used_cpus
-            avail_mem = self.total_mem_mb - used_mem
-
-            # 4. Fetch pending jobs (priority desc, FIFO within priority)
-            pending_jobs = self._get_pending_jobs()
-
-            # 5. Try to start jobs while we have capacity (with topology awareness)
-            used_nodes = self._get_used_nodes(running)
-            for job in pending_jobs:
-                job_id, command, cpus, mem_mb, priority, is_elastic, min_cpus, max_cpus = job
-                if cpus <= avail_cpus and mem_mb <= avail_mem:
+            # All state transitions of one tick share a single transaction
+            with self._transaction():
+                # 0. Pick up jobs submitted/cancelled by other processes
+                self._sync_pending()
+
+                # 1. Check running jobs for completion
+                self._update_running_jobs(running)
+
+                # 2. Compute available resources
+                avail_cpus = self.total_cpus - self._used_cpus
+
+                # 3. Elastic job scaling (before scheduling new jobs)
+                if enable_elastic_scaling:
+                    self._scale_elastic_jobs(running, avail_cpus, elastic_scale_threshold,
+                                             elastic_rescale_gap)
+
+                # Recompute resources after scaling
+                avail_cpus = self.total_cpus - self._used_cpus
+                avail_mem = self.total_mem_mb - self._used_mem
+
+                # 4. Start jobs in heap order (priority desc, FIFO within priority)
+                #    while we have capacity, with topology awareness. Jobs that
+                #    don't fit are set aside so smaller ones can backfill.
+                used_nodes = self._get_used_nodes(running)
+                started = []  # RUNNING-state updates, written in one batch below
+                skipped = []
+                heap = self._pending_heap
+                while heap and avail_cpus > 0:
+                    entry = heapq.heappop(heap)
+                    if entry[2] not in self._pending_ids:
+                        continue  # cancelled
+                    (job_id, command, cpus, mem_mb, priority, is_elastic,
+                     min_cpus, max_cpus, submit_time) = entry[3]
+                    if cpus > avail_cpus or mem_mb > avail_mem:
+                        skipped.append(entry)
+                        continue
+
                     # Use topology-aware node selection if enabled
                     selected_nodes = None
                     if self.topology.enabled and self.topology.nodes:
                         # Calculate how many nodes we need
                         # For simplicity, assume each node has equal CPUs
                         # In a real system, this would be more sophisticated
-                        cpus_per_node = getattr(self.topology, 'total_cpus_per_node', 1)
-                        mem_per_node = getattr(self.topology, 'total_mem_per_node', self.total_mem_mb // max(len(self.topology.nodes), 1))
+                        cpus_per_node = self.topology.total_cpus_per_node
+                        mem_per_node = self.topology.total_mem_per_node
                         num_nodes = (cpus + cpus_per_node - 1) // cpus_per_node
-                        
+
                         selected_nodes = self.topology.find_best_nodes(
                             num_nodes, cpus_per_node, mem_per_node, used_nodes
                         )
-                        
-                        # If topology selection failed, fall back to simple scheduling
+
                         if selected_nodes is None:
                             # Not enough nodes available, skip this job
+                            skipped.append(entry)
                             continue
-                    else:
-                        # Non-topology mode: just check resource availability
-                        pass
-                    
-                    self._start_job(job_id, command, cpus, mem_mb, running, 
+
+                    self._pending_ids.discard(job_id)
+                    self._start_job(job_id, command, cpus, mem_mb, running,
                                    is_elastic=bool(is_elastic), min_cpus=min_cpus, max_cpus=max_cpus,
-                                   nodes=selected_nodes)
+                                   nodes=selected_nodes, submit_time=submit_time,
+                                   updates=started)
                     avail_cpus -= cpus
                     avail_mem -= mem_mb
                     if selected_nodes:
                         used_nodes.update(selected_nodes)
 
-            time.sleep(poll_interval)
+                for entry in skipped:
+                    heapq.heappush(heap, entry)
+
+                self._mark_jobs_running(started)
+
+            self._refill_log_pool()
+            selector.select(timeout=poll_interval)
+            self._drain_wakeups()
 
     def _get_pending_jobs(self):
-        conn = get_conn()
-        c = conn.cursor()
-        c.execute(
-            """
-            SELECT id, command, cpus, mem_mb, priority, is_elastic, min_cpus, max_cpus
-            FROM jobs
-            WHERE status = 'PENDING'
-            ORDER BY priority DESC, submit_time ASC
-            """
-        )
-        rows = c.fetchall()
-        conn.close()
-        return rows
+        return self.conn.execute(_SQL_PENDING).fetchall()
+
+    def _push_pending(self, job_id: int, params: dict):
+        """Add a job inserted through this connection to the pending heap."""
+        if job_id in self._pending_ids:
+            return
+        row = (job_id, params['command'], params['cpus'], params['mem_mb'], params['priority'],
+               params['is_elastic'], params['min_cpus'], params['max_cpus'], params['submit_time'])
+        self._pending_ids.add(job_id)
+        heapq.heappush(self._pending_heap, (-row[4], row[8], job_id, row))
+
+    def _sync_pending(self):
+        """
+        Rebuild the pending heap from the DB, but only if another connection
+        (e.g. a CLI submit or cancel) has committed since the last sync.
+        """
+        version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+        if version == self._data_version:
+            return
+        self._data_version = version
+        rows = self._get_pending_jobs()
+        self._pending_ids = {row[0] for row in rows}
+        self._pending_heap = [(-row[4], row[8], row[0], row) for row in rows]
+        heapq.heapify(self._pending_heap)
+
+    def _highest_pending_demand(self) -> Tuple[Optional[int], int]:
+        """
+        Highest priority among pending jobs and the total CPUs its jobs need,
+        in one pass over the heap (None, 0 if nothing is pending).
+        """
+        highest, needed = None, 0
+        for neg_priority, _, job_id, row in self._pending_heap:
+            if job_id not in self._pending_ids:
+                continue
+            if highest is None or -neg_priority > highest:
+                highest, needed = -neg_priority, row[2]
+            elif -neg_priority == highest:
+                needed += row[2]
+        return highest, needed
     
     def _get_running_elastic_jobs(self):
         """Get all running elastic jobs with their current resource allocation."""
-        conn = get_conn()
-        c = conn.cursor()
-        c.execute(
-            """
-            SELECT id, current_cpus, min_cpus, max_cpus, priority, control_file
-            FROM jobs
-            WHERE status = 'RUNNING' AND is_elastic = 1
-            ORDER BY priority ASC, submit_time ASC
-            """
-        )
-        rows = c.fetchall()
-        conn.close()
-        return rows
+        return self.conn.execute(_SQL_RUNNING_ELASTIC).fetchall()
     
     def _update_job_cpus(self, job_id: int, new_cpus: int):
         """Update the CPU allocation for a running elastic job."""
-        conn = get_conn()
-        c = conn.cursor()
-        c.execute(
-            """
-            UPDATE jobs
-            SET current_cpus = :new_cpus, cpus = :new_cpus
-            WHERE id = :job_id
-            """,
-            {'job_id': job_id, 'new_cpus': new_cpus}
-        )
-        conn.commit()
-        conn.close()
+        with self._transaction() as conn:
+            conn.execute(_SQL_UPDATE_CPUS, {'job_id': job_id, 'new_cpus': new_cpus})
+    
+    def _get_node_cpus(self) -> Dict[str, Tuple[int, ...]]:
+        """
+        Map each topology node to the CPU indices it stands for, built once
+        per topology (e.g. "node1" -> (0,), "node2" -> (1,) with 1 CPU/node).
+        """
+        if self._node_cpus is None:
+            cpus_per_node = self.topology.total_cpus_per_node
+            node_cpus = {}
+            for node_name in self.topology.nodes:
+                match = _RE_NODE.match(node_name)
+                if match:
+                    first = (int(match.group(1)) - 1) * cpus_per_node
+                    node_cpus[node_name] = tuple(
+                        range(first, min(first + cpus_per_node, self.total_cpus))
+                    )
+            self._node_cpus = node_cpus
+        return self._node_cpus
     
     def _get_used_nodes(self, running: dict) -> Set[str]:
         """Get set of nodes currently used by running jobs."""
+        # Read from the running dict, which records each job's nodes at start,
+        # rather than one SELECT per running job every tick
         used_nodes = set()
-        conn = get_conn()
-        c = conn.cursor()
-        for job_id in running.keys():
-            c.execute("SELECT nodes FROM jobs WHERE id = :job_id", {'job_id': job_id})
-            row = c.fetchone()
-            if row and row[0]:
-                try:
-                    nodes_list = json.loads(row[0])
-                    used_nodes.update(nodes_list)
-                except (json.JSONDecodeError, TypeError):
-                    pass
-        conn.close()
+        for info in running.values():
+            if info["nodes"]:
+                used_nodes.update(info["nodes"])
         return used_nodes
     
     def _get_cluster_utilization(self, used_cpus: int, used_mem: int) -> dict:
@@ -626,13 +1005,77 @@ class MiniSlurm:
             'available_mem_mb': self.total_mem_mb - used_mem,
         }
 
+    def _open_log_pair(self) -> tuple:
+        flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_CLOEXEC", 0)
+        pair = []
+        for ext in ("out", "err"):
+            self._log_seq += 1
+            tmp_path = os.path.join(LOG_DIR, f".pool_{os.getpid()}_{self._log_seq}.{ext}")
+            pair += [os.open(tmp_path, flags, 0o644), tmp_path]
+        return tuple(pair)
+
+    def _refill_log_pool(self):
+        """Top up the pre-opened log file pool (called between ticks)."""
+        try:
+            while len(self._log_pool) < LOG_POOL_SIZE:
+                self._log_pool.append(self._open_log_pair())
+        except OSError as e:
+            print(f"[mini-slurm] Warning: Could not pre-open log files: {e}", file=sys.stderr)
+
+    def _remove_stale_log_pool_files(self):
+        """Delete pool files left behind by schedulers that were killed."""
+        with os.scandir(LOG_DIR) as entries:
+            # The directory is mostly job logs; skip those before the regex
+            stale = [(entry.name, entry.path) for entry in entries
+                     if entry.name.startswith(".pool_")]
+        for name, path in stale:
+            match = _RE_POOL_FILE.match(name)
+            if not match:
+                continue
+            pid = int(match.group(1))
+            if pid != os.getpid():
+                try:
+                    os.kill(pid, 0)
+                    continue  # owner still running
+                except ProcessLookupError:
+                    pass
+                except PermissionError:
+                    continue
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _close_log_pool(self):
+        for fd_out, tmp_out, fd_err, tmp_err in self._log_pool:
+            for fd, path in ((fd_out, tmp_out), (fd_err, tmp_err)):
+                os.close(fd)
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+        self._log_pool.clear()
+
+    def _take_log_files(self, stdout_path: str, stderr_path: str) -> tuple:
+        """Return (stdout_fd, stderr_fd) opened on the job's log paths."""
+        fd_out, tmp_out, fd_err, tmp_err = (
+            self._log_pool.pop() if self._log_pool else self._open_log_pair()
+        )
+        os.replace(tmp_out, stdout_path)
+        os.replace(tmp_err, stderr_path)
+        return fd_out, fd_err
+
     def _start_job(self, job_id: int, command: str, cpus: int, mem_mb: int, running: dict,
                    is_elastic: bool = False, min_cpus: Optional[int] = None, max_cpus: Optional[int] = None,
-                   nodes: Optional[List[str]] = None):
+                   nodes: Optional[List[str]] = None, submit_time: Optional[float] = None,
+                   updates: Optional[list] = None):
         """
         Start a job as a subprocess, update DB with start_time & log paths.
         Enforces CPU affinity and memory limits.
         For elastic jobs, creates a control file for resource updates.
+
+        If `updates` is given, the RUNNING-state row update is appended to it
+        for the caller to write with _mark_jobs_running() instead of immediately.
         """
         stdout_path = os.path.join(LOG_DIR, f"job_{job_id}.out")
         stderr_path = os.path.join(LOG_DIR, f"job_{job_id}.err")
@@ -641,16 +1084,10 @@ class MiniSlurm:
         if is_elastic:
             control_file = os.path.join(LOG_DIR, f"job_{job_id}.control")
             # Create control file with initial resource allocation
-            with open(control_file, 'w') as f:
-                f.write(f"CPUS={cpus}\n")
-                f.write(f"MEM_MB={mem_mb}\n")
-                f.write(f"MIN_CPUS={min_cpus}\n")
-                f.write(f"MAX_CPUS={max_cpus}\n")
-                f.write(f"STATUS=RUNNING\n")
+            _write_control_file(control_file, cpus, mem_mb, min_cpus, max_cpus)
 
-        # open log files
-        stdout_f = open(stdout_path, "wb")
-        stderr_f = open(stderr_path, "wb")
+        # Take pre-opened log files from the pool and move them into place
+        stdout_fd, stderr_fd = self._take_log_files(stdout_path, stderr_path)
 
         def preexec_fn():
             """Set up resource limits before exec."""
@@ -662,16 +1099,13 @@ class MiniSlurm:
             except (ValueError, OSError) as e:
                 # On macOS, RLIMIT_AS may not work; log but continue
                 print(f"[mini-slurm] Warning: Could not set memory limit: {e}", file=sys.stderr)
-            
-            # Create new process group
-            os.setsid()
 
         elastic_str = " [ELASTIC]" if is_elastic else ""
         nodes_str = f" nodes={','.join(nodes)}" if nodes else ""
         print(f"[mini-slurm] Starting job {job_id}: {command} (CPUs={cpus}, Mem={mem_mb}MB){nodes_str}{elastic_str}")
         
         # Build command with CPU affinity if possible
-        cmd_to_run = command
+        affinity_args: List[str] = []
         env = os.environ.copy()
         
         # Set environment variables for elastic jobs
@@ -690,17 +1124,10 @@ class MiniSlurm:
                 # Map nodes to CPU indices
                 # In a real system, nodes would have specific CPU ranges
                 # For now, map node names to CPU indices
+                node_cpus = self._get_node_cpus()
                 cpu_indices = []
                 for node_name in nodes:
-                    # Extract node number (e.g., "node1" -> 0, "node2" -> 1)
-                    match = re.match(r'node(\d+)', node_name)
-                    if match:
-                        node_num = int(match.group(1)) - 1
-                        cpus_per_node = self.topology.total_cpus_per_node if hasattr(self.topology, 'total_cpus_per_node') else 1
-                        for i in range(cpus_per_node):
-                            cpu_idx = node_num * cpus_per_node + i
-                            if cpu_idx < self.total_cpus:
-                                cpu_indices.append(cpu_idx)
+                    cpu_indices.extend(node_cpus.get(node_name, ()))
                 if cpu_indices:
                     cpu_list = cpu_indices[:cpus]  # Limit to requested CPUs
             else:
@@ -710,65 +1137,60 @@ class MiniSlurm:
             if cpu_list:
                 if platform.system() == "Linux":
                     cpu_str = ",".join(str(i) for i in cpu_list)
-                    cmd_to_run = f"taskset -c {cpu_str} {command}"
+                    affinity_args = ["taskset", "-c", cpu_str]
                 elif platform.system() == "Darwin":
                     # macOS: set CPU count via environment variables for common libraries
                     env["OMP_NUM_THREADS"] = str(len(cpu_list))
                     env["MKL_NUM_THREADS"] = str(len(cpu_list))
                     env["NUMEXPR_NUM_THREADS"] = str(len(cpu_list))
         
-        # Note: shell=True lets users pass "python train.py" comfortably
-        proc = subprocess.Popen(
-            cmd_to_run,
-            shell=True,
-            stdout=stdout_f,
-            stderr=stderr_f,
+        popen_kwargs = dict(
+            stdout=stdout_fd,
+            stderr=stderr_fd,
             preexec_fn=preexec_fn,
-            env=env,
+            start_new_session=True,  # own process group, as os.setsid() did
         )
+        proc = None
+        try:
+            # Plain "python train.py"-style commands are exec'd directly;
+            # anything needing shell features still goes through /bin/sh.
+            simple = _split_simple_command(command)
+            if simple is not None:
+                cmd_env, argv = simple
+                try:
+                    proc = subprocess.Popen(affinity_args + argv, env={**env, **cmd_env}, **popen_kwargs)
+                except (FileNotFoundError, PermissionError):
+                    # Shell builtins, missing programs: let sh run it and report
+                    pass
+            if proc is None:
+                cmd_to_run = " ".join(affinity_args + [command])
+                proc = subprocess.Popen(cmd_to_run, shell=True, env=env, **popen_kwargs)
+        finally:
+            # The child has its own copies; the scheduler doesn't need them
+            os.close(stdout_fd)
+            os.close(stderr_fd)
 
-        ps_proc = psutil.Process(proc.pid) if psutil is not None else None
         start_time = time.time()
 
-        conn = get_conn()
-        c = conn.cursor()
-        submit_time = c.execute(
-            "SELECT submit_time FROM jobs WHERE id = :job_id", {'job_id': job_id}
-        ).fetchone()[0]
-        wait_time = start_time - submit_time
-        nodes_json = json.dumps(nodes) if nodes else None
-        c.execute(
-            """
-            UPDATE jobs
-            SET status = 'RUNNING',
-                start_time = :start_time,
-                wait_time = :wait_time,
-                stdout_path = :stdout_path,
-                stderr_path = :stderr_path,
-                control_file = :control_file,
-                current_cpus = :current_cpus,
-                nodes = :nodes
-            WHERE id = :job_id
-            """,
-            {
-                'start_time': start_time,
-                'wait_time': wait_time,
-                'stdout_path': stdout_path,
-                'stderr_path': stderr_path,
-                'control_file': control_file,
-                'current_cpus': cpus if is_elastic else None,
-                'nodes': nodes_json,
-                'job_id': job_id,
-            },
-        )
-        conn.commit()
-        conn.close()
+        if submit_time is None:
+            submit_time = self.conn.execute(_SQL_SUBMIT_TIME, {'job_id': job_id}).fetchone()[0]
+        update = {
+            'start_time': start_time,
+            'wait_time': start_time - submit_time,
+            'stdout_path': stdout_path,
+            'stderr_path': stderr_path,
+            'control_file': control_file,
+            'current_cpus': cpus if is_elastic else None,
+            'nodes': _json_encode(nodes) if nodes else None,
+            'job_id': job_id,
+        }
+        if updates is not None:
+            updates.append(update)
+        else:
+            self._mark_jobs_running([update])
 
         running[job_id] = {
             "proc": proc,
-            "ps_proc": ps_proc,
-            "stdout_f": stdout_f,
-            "stderr_f": stderr_f,
             "cpus": cpus,
             "mem_mb": mem_mb,
             "start_time": start_time,
@@ -778,61 +1200,102 @@ class MiniSlurm:
             "control_file": control_file,
             "nodes": nodes,
         }
+        self._pid_to_job[proc.pid] = job_id
+        self._used_cpus += cpus
+        self._used_mem += mem_mb
 
-    def _update_running_jobs(self, running: dict):
+    def _mark_jobs_running(self, updates: List[dict]):
+        """Write the RUNNING-state updates for newly started jobs in one statement."""
+        if not updates:
+            return
+        with self._transaction() as conn:
+            conn.executemany(_SQL_START_UPDATE, updates)
+
+    def _reap_exited(self) -> List[tuple]:
         """
-        For each running job, check if finished; if so, compute metrics and update DB.
+        Reap every exited child in one os.wait4(-1) loop, once SIGCHLD has
+        fired, as (job_id, return code, user CPU, system CPU).
+
+        Only used while this scheduler owns SIGCHLD on the main thread: in a
+        thread a wildcard reap could steal exit statuses from other
+        subprocesses of the interpreter. Children that aren't jobs are reaped
+        and ignored.
         """
-        finished_job_ids = []
+        if not self._child_exited:
+            return []
+        # Cleared before reaping so a child exiting mid-loop sets it again
+        self._child_exited = False
+        exited = []
+        while True:
+            try:
+                pid, status, rusage = os.wait4(-1, os.WNOHANG)
+            except ChildProcessError:
+                break  # no children left
+            if pid == 0:
+                break  # the rest are still running
+            job_id = self._pid_to_job.pop(pid, None)
+            if job_id is not None:
+                exited.append((job_id, _exit_code(status), rusage.ru_utime, rusage.ru_stime))
+        return exited
 
-        for job_id, info in list(running.items()):
+    def _poll_running(self, running: dict) -> List[tuple]:
+        """Reap exited jobs one tracked pid at a time, in _reap_exited's format."""
+        exited = []
+        for job_id, info in running.items():
             proc: subprocess.Popen = info["proc"]
-            ret = proc.poll()
+            cpu_user = cpu_system = None
+            try:
+                # Reap and read CPU usage (including reaped descendants) in one call
+                pid, status, rusage = os.wait4(proc.pid, os.WNOHANG)
+            except ChildProcessError:
+                # Already reaped elsewhere (e.g. by Popen itself)
+                ret = proc.poll()
+            else:
+                if pid == 0:
+                    continue  # still running
+                ret = _exit_code(status)
+                cpu_user = rusage.ru_utime
+                cpu_system = rusage.ru_stime
             if ret is None:
                 continue  # still running
+            self._pid_to_job.pop(proc.pid, None)
+            exited.append((job_id, ret, cpu_user, cpu_system))
+        return exited
+
+    def _update_running_jobs(self, running: dict):
+        """
+        Record jobs whose processes have exited: compute metrics and update DB.
+        """
+        finished_job_ids = []
+        # Row updates, written in two batches below: clean exits only need the
+        # narrow fast-path UPDATE
+        fast_batch = []
+        slow_batch = []
+
+        exited = self._reap_exited() if self._reap_all else self._poll_running(running)
+        for job_id, ret, cpu_user, cpu_system in exited:
+            info = running.get(job_id)
+            if info is None:
+                continue
+            # Reaped here, so Popen must not wait on the pid again
+            info["proc"].returncode = ret
 
             # Process finished
             end_time = time.time()
             runtime = end_time - info["start_time"]
-            cpu_user = cpu_system = None
-
-            if psutil is not None and info["ps_proc"] is not None:
-                try:
-                    times = info["ps_proc"].cpu_times()
-                    cpu_user = times.user
-                    cpu_system = times.system
-                except psutil.Error:
-                    pass
 
-            # Close log files
-            info["stdout_f"].close()
-            info["stderr_f"].close()
-
-            conn = get_conn()
-            c = conn.cursor()
-            c.execute(
-                """
-                UPDATE jobs
-                SET status = :status,
-                    end_time = :end_time,
-                    runtime = :runtime,
-                    return_code = :return_code,
-                    cpu_user_time = :cpu_user_time,
-                    cpu_system_time = :cpu_system_time
-                WHERE id = :job_id
-                """,
-                {
-                    'status': "COMPLETED" if ret == 0 else "FAILED",
+            if ret == 0:
+                fast_batch.append((end_time, runtime, cpu_user, cpu_system, job_id))
+            else:
+                slow_batch.append({
+                    'status': "FAILED",
                     'end_time': end_time,
                     'runtime': runtime,
                     'return_code': ret,
                     'cpu_user_time': cpu_user,
                     'cpu_system_time': cpu_system,
                     'job_id': job_id,
-                },
-            )
-            conn.commit()
-            conn.close()
+                })
 
             print(
                 f"[mini-slurm] Job {job_id} finished with rc={ret} "
@@ -840,9 +1303,19 @@ class MiniSlurm:
             )
             finished_job_ids.append(job_id)
 
+        if fast_batch or slow_batch:
+            with self._transaction() as conn:
+                if fast_batch:
+                    conn.executemany(_SQL_COMPLETE_FAST, fast_batch)
+                if slow_batch:
+                    conn.executemany(_SQL_COMPLETE_UPDATE, slow_batch)
+
         # Remove finished jobs from running dict
         for job_id in finished_job_ids:
             info = running.pop(job_id, None)
+            if info:
+                self._used_cpus -= info["cpus"]
+                self._used_mem -= info["mem_mb"]
             # Clean up control file for elastic jobs
             if info and info.get("control_file") and os.path.exists(info["control_file"]):
                 try:
@@ -850,65 +1323,86 @@ class MiniSlurm:
                 except OSError:
                     pass
     
-    def _scale_elastic_jobs(self, running: dict, avail_cpus: int, scale_threshold: float):
+    def _scale_elastic_jobs(self, running: dict, avail_cpus: int, scale_threshold: float,
+                            rescale_gap: float = ELASTIC_RESCALE_GAP):
         """
         Scale elastic jobs based on cluster utilization and available resources.
         
         Policies:
         1. Scale UP: If cluster utilization < threshold and resources available
         2. Scale DOWN: If high-priority jobs need resources (preemption)
-        """
-        if avail_cpus <= 0:
-            return
         
+        A job rescaled less than rescale_gap seconds ago is not scaled up
+        again, so fluctuating availability can't make it thrash between
+        sizes. Scale-down ignores the gap: a job that just grew must still
+        give way to higher-priority pending work.
+        """
         # Get cluster utilization
-        used_cpus = sum(info["cpus"] for info in running.values())
-        util = self._get_cluster_utilization(used_cpus, sum(info["mem_mb"] for info in running.values()))
+        util = self._get_cluster_utilization(self._used_cpus, self._used_mem)
         
         # Get running elastic jobs sorted by priority (low priority first for scale-down)
-        elastic_jobs = self._get_running_elastic_jobs()
+        now = time.monotonic()
+        elastic_jobs = [job for job in self._get_running_elastic_jobs() if job[0] in running]
+        cooling = {
+            job[0] for job in elastic_jobs
+            if now - running[job[0]].get("last_scale_time", float("-inf")) < rescale_gap
+        }
+        alloc = {job[0]: job[1] for job in elastic_jobs}  # job_id -> planned CPUs
+        min_cpus_of = {job[0]: job[2] for job in elastic_jobs}
         
-        # Scale UP: If utilization is low, give more resources to elastic jobs
+        # Scale UP: If utilization is low, give more resources to elastic jobs.
+        # Each job's value is concave in its CPUs, so handing out free CPUs one
+        # at a time to the largest marginal gain (ties: higher priority first)
+        # is the optimal split, rather than giving them all to the first job.
         if util['overall_utilization'] < scale_threshold and avail_cpus > 0:
-            for job_id, current_cpus, min_cpus, max_cpus, priority, control_file in elastic_jobs:
-                if job_id not in running:
-                    continue
-                
-                if current_cpus < max_cpus and avail_cpus > 0:
-                    # Calculate how many CPUs we can add
-                    cpus_to_add = min(avail_cpus, max_cpus - current_cpus)
-                    if cpus_to_add > 0:
-                        new_cpus = current_cpus + cpus_to_add
-                        self._scale_job_resources(job_id, new_cpus, running)
-                        avail_cpus -= cpus_to_add
-                        print(f"[mini-slurm] Scaled UP job {job_id}: {current_cpus} -> {new_cpus} CPUs "
-                              f"(utilization: {util['overall_utilization']:.1f}%)")
+            heap = [(-_elastic_gain(current_cpus, min_cpus), -priority, job_id, max_cpus)
+                    for job_id, current_cpus, min_cpus, max_cpus, priority, _ in elastic_jobs
+                    if current_cpus < max_cpus and job_id not in cooling]
+            heapq.heapify(heap)
+            while heap and avail_cpus > 0:
+                _, neg_priority, job_id, max_cpus = heapq.heappop(heap)
+                alloc[job_id] += 1
+                avail_cpus -= 1
+                if alloc[job_id] < max_cpus:
+                    gain = _elastic_gain(alloc[job_id], min_cpus_of[job_id])
+                    heapq.heappush(heap, (-gain, neg_priority, job_id, max_cpus))
         
         # Scale DOWN: Check if we need to free resources for high-priority pending jobs
-        pending_jobs = self._get_pending_jobs()
-        if pending_jobs:
-            # Find highest priority pending job
-            highest_priority = max(job[4] for job in pending_jobs)
-            needed_cpus = sum(job[2] for job in pending_jobs if job[4] == highest_priority)
-            
+        # Find highest priority pending job
+        highest_priority, needed_cpus = self._highest_pending_demand()
+        if highest_priority is not None:
             if needed_cpus > avail_cpus:
-                # Need to scale down elastic jobs to make room
+                # Need to scale down elastic jobs to make room: take CPUs from
+                # the lowest-priority jobs first, and within a priority from
+                # the job that loses the least value per CPU
                 cpus_needed = needed_cpus - avail_cpus
-                for job_id, current_cpus, min_cpus, max_cpus, priority, control_file in elastic_jobs:
-                    if job_id not in running:
-                        continue
-                    if cpus_needed <= 0:
-                        break
-                    
-                    if current_cpus > min_cpus:
-                        # Scale down this job
-                        cpus_to_release = min(cpus_needed, current_cpus - min_cpus)
-                        new_cpus = current_cpus - cpus_to_release
-                        self._scale_job_resources(job_id, new_cpus, running)
-                        cpus_needed -= cpus_to_release
-                        avail_cpus += cpus_to_release
-                        print(f"[mini-slurm] Scaled DOWN job {job_id}: {current_cpus} -> {new_cpus} CPUs "
-                              f"(to make room for priority {highest_priority} jobs)")
+                heap = [(priority, _elastic_gain(alloc[job_id] - 1, min_cpus), job_id)
+                        for job_id, _, min_cpus, _, priority, _ in elastic_jobs
+                        if alloc[job_id] > min_cpus]
+                heapq.heapify(heap)
+                while heap and cpus_needed > 0:
+                    priority, _, job_id = heapq.heappop(heap)
+                    alloc[job_id] -= 1
+                    cpus_needed -= 1
+                    avail_cpus += 1
+                    if alloc[job_id] > min_cpus_of[job_id]:
+                        loss = _elastic_gain(alloc[job_id] - 1, min_cpus_of[job_id])
+                        heapq.heappush(heap, (priority, loss, job_id))
+        
+        # Apply the plan: one rescale (and one DB write, in one transaction)
+        # per job whose allocation actually changed
+        with self._transaction():
+            for job_id, current_cpus, *_ in elastic_jobs:
+                new_cpus = alloc[job_id]
+                if new_cpus == current_cpus:
+                    continue
+                self._scale_job_resources(job_id, new_cpus, running)
+                if new_cpus > current_cpus:
+                    print(f"[mini-slurm] Scaled UP job {job_id}: {current_cpus} -> {new_cpus} CPUs "
+                          f"(utilization: {util['overall_utilization']:.1f}%)")
+                else:
+                    print(f"[mini-slurm] Scaled DOWN job {job_id}: {current_cpus} -> {new_cpus} CPUs "
+                          f"(to make room for priority {highest_priority} jobs)")
     
     def _scale_job_resources(self, job_id: int, new_cpus: int, running: dict):
         """Update resource allocation for a running elastic job."""
@@ -923,38 +1417,27 @@ class MiniSlurm:
         
         # Update in-memory tracking
         info["cpus"] = new_cpus
+        info["last_scale_time"] = time.monotonic()
+        self._used_cpus += new_cpus - old_cpus
         
-        # Update control file
+        # Update control file: everything in it is known here, so rewrite it
+        # whole instead of reading and patching the old one
         if info.get("control_file") and os.path.exists(info["control_file"]):
             try:
-                with open(info["control_file"], 'r') as f:
-                    lines = f.readlines()
-                
-                # Update CPUS line
-                updated_lines = []
-                for line in lines:
-                    if line.startswith("CPUS="):
-                        updated_lines.append(f"CPUS={new_cpus}\n")
-                    elif line.startswith("SCALE_EVENT="):
-                        # Update or add scale event
-                        updated_lines.append(f"SCALE_EVENT={time.time()}\n")
-                    else:
-                        updated_lines.append(line)
-                
-                # Add scale event if not present
-                if not any("SCALE_EVENT=" in line for line in updated_lines):
-                    updated_lines.append(f"SCALE_EVENT={time.time()}\n")
-                
-                with open(info["control_file"], 'w') as f:
-                    f.writelines(updated_lines)
+                _write_control_file(info["control_file"], new_cpus, info["mem_mb"],
+                                    info["min_cpus"], info["max_cpus"],
+                                    scale_event=time.time())
             except (OSError, IOError) as e:
                 print(f"[mini-slurm] Warning: Could not update control file for job {job_id}: {e}", 
                       file=sys.stderr)
         
-        # Send SIGUSR1 signal to notify the job (if supported)
+        # Send SIGUSR1 signal to notify the job (if supported). Not through
+        # Popen.send_signal: its poll() would reap an exited job behind
+        # _reap_exited's back. Until the scheduler reaps it, the pid can't
+        # have been reused.
         try:
             proc = info["proc"]
-            if proc.poll() is None:  # Process still running
-                proc.send_signal(signal.SIGUSR1)
+            if proc.returncode is None:
+                os.kill(proc.pid, signal.SIGUSR1)
         except (OSError, AttributeError):
             pass  # Signal not supported or process already dead
@@ -3,15 +3,29 @@
 import os
 import sqlite3
 from pathlib import Path
+from typing import Optional
 
 DB_PATH = os.path.expanduser("~/.mini_slurm.db")
 
+# Seconds to wait on a locked database so concurrent `mini-slurm` processes
+# queue up behind each other instead of failing with "database is locked"
+DB_TIMEOUT = 30.0
+
+# Bumped whenever init_db gains a migration; stored in PRAGMA user_version so
+# an up-to-date database skips the DDL below entirely
+# (1 = elastic columns, 2 = nodes column + status/priority index)
+SCHEMA_VERSION = 2
+
 
 def init_db(db_path: str = DB_PATH):
     """Initialize the SQLite database with the jobs table."""
     Path(os.path.dirname(db_path)).mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(db_path)
+    conn = sqlite3.connect(db_path, timeout=DB_TIMEOUT)
     c = conn.cursor()
+    c.execute("PRAGMA user_version")
+    if c.fetchone()[0] >= SCHEMA_VERSION:
+        conn.close()
+        return
     c.execute(
         """
         CREATE TABLE IF NOT EXISTS jobs (
@@ -66,10 +80,52 @@ def init_db(db_path: str = DB_PATH):
         c.execute("ALTER TABLE jobs ADD COLUMN nodes TEXT")
     except sqlite3.OperationalError:
         pass
+    # Back the scheduler's pending-queue scan (and any filter on status)
+    c.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_jobs_status_priority
+        ON jobs(status, priority DESC, submit_time ASC)
+        """
+    )
+    c.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
     conn.commit()
     conn.close()
 
 
 def get_conn():
     """Get a database connection."""
-    return sqlite3.connect(DB_PATH)
+    return sqlite3.connect(DB_PATH, timeout=DB_TIMEOUT)
+
+
+def open_persistent_conn(db_path: Optional[str] = None) -> sqlite3.Connection:
+    """
+    Open a long-lived connection for a MiniSlurm instance.
+
+    The connection runs in autocommit mode (transactions are explicit), may be
+    shared with the scheduler thread, and uses WAL so CLI readers never block
+    on the scheduler's writes.
+    """
+    conn = sqlite3.connect(
+        db_path or DB_PATH,
+        timeout=DB_TIMEOUT,
+        check_same_thread=False,
+        isolation_level=None,
+        cached_statements=256,
+    )
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA mmap_size=268435456")
+    return conn
+
+
+def tune_scheduler_conn(conn: sqlite3.Connection) -> None:
+    """
+    Extra settings for the scheduler's connection, which stays open for the
+    life of the daemon and touches the jobs table every tick.
+
+    Locking mode is left NORMAL: an EXCLUSIVE lock would keep CLI submits and
+    cancels out of the database while the scheduler runs.
+    """
+    conn.execute("PRAGMA cache_size=-20000")  # ~20 MB, keeps jobs + indexes hot
+    conn.execute("PRAGMA wal_autocheckpoint=1000")
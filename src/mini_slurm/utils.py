@@ -1,30 +1,55 @@
 """Utility functions for mini-slurm."""
 
 import os
-from datetime import datetime
-from typing import Optional
+import re
+import shlex
+import time
+from functools import lru_cache
+from typing import Mapping, Optional
 
 
+# Multiplier to MB keyed by the (upper-cased) unit suffix
+_MEM_UNITS = {"": 1, "M": 1, "MB": 1, "G": 1024, "GB": 1024}
+# Number, then an optional unit suffix from _MEM_UNITS
+_MEM_RE = re.compile(r'\s*(\d+\.?\d*|\.\d+)\s*(GB|MB|G|M|)\s*', re.IGNORECASE)
+
+
+@lru_cache(maxsize=256)
 def parse_mem(mem_str: str) -> int:
     """
     Convert memory strings like '8GB', '1024MB', '2g', '512m' into MB.
     """
-    s = mem_str.strip().upper()
-    if s.endswith("GB") or s.endswith("G"):
-        value = float(s.rstrip("GB").rstrip("G"))
-        return int(value * 1024)
-    if s.endswith("MB") or s.endswith("M"):
-        value = float(s.rstrip("MB").rstrip("M"))
-        return int(value)
+    match = _MEM_RE.fullmatch(mem_str)
+    if match is None:
+        raise ValueError(f"invalid memory size: {mem_str!r}")
+    number, unit = match.groups()
     # bare number => MB
-    return int(float(s))
+    return int(float(number) * _MEM_UNITS[unit.upper()])
+
+
+def with_env(command: str, env: Optional[Mapping[str, str]] = None) -> str:
+    """
+    Prefix a shell command with KEY=VALUE assignments, quoting each value.
+    """
+    if not env:
+        return command
+    assignments = " ".join(f"{key}={shlex.quote(str(value))}" for key, value in env.items())
+    return f"{assignments} {command}"
+
+
+@lru_cache(maxsize=4096)
+def _format_second(second: int) -> str:
+    tm = time.localtime(second)
+    return (f"{tm.tm_year:04d}-{tm.tm_mon:02d}-{tm.tm_mday:02d} "
+            f"{tm.tm_hour:02d}:{tm.tm_min:02d}:{tm.tm_sec:02d}")
 
 
 def format_ts(ts: Optional[float]) -> str:
     """Format timestamp to readable string."""
     if ts is None:
         return "-"
-    return datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M:%S")
+    # Cached per whole second: queue rows submitted together share the string
+    return _format_second(int(ts))
 
 
 def current_user() -> str:
@@ -7,6 +7,41 @@ import numpy as np
 import time
 import os
 
+# Rows per block for the passes that stream over the whole dataset
+BLOCK_ROWS = 65536
+
+def column_mean_std(data, block_rows=BLOCK_ROWS):
+    """
+    Per-column mean (in data's dtype) and population standard deviation.
+
+    Works on blocks of whole rows so every pass streams through memory in
+    order and temporaries stay block-sized, unlike np.std which allocates a
+    full-size copy of the deviations.
+    """
+    num_rows = data.shape[0]
+    mean = data.mean(axis=0, dtype=np.float64).astype(data.dtype)
+    
+    sq_dev = np.zeros(data.shape[1], dtype=np.float64)
+    for start in range(0, num_rows, block_rows):
+        dev = data[start:start + block_rows] - mean
+        sq_dev += np.einsum('ij,ij->j', dev, dev, dtype=np.float64)
+    return mean, np.sqrt(sq_dev / num_rows)
+
+
+def replace_outliers(data, num_std=3, block_rows=BLOCK_ROWS):
+    """
+    Replace values more than num_std standard deviations from their column
+    mean with that mean, in place, one block of rows at a time.
+    """
+    num_rows = data.shape[0]
+    mean, std = column_mean_std(data, block_rows)
+    limit = num_std * std
+    
+    for start in range(0, num_rows, block_rows):
+        block = data[start:start + block_rows]
+        np.copyto(block, mean, where=np.abs(block - mean) > limit)
+
+
 def process_large_dataset(num_rows=10_000_000, num_features=100):
     """Process a large dataset with various transformations."""
     print(f"[Data Processing] Processing dataset: {num_rows:,} rows x {num_features} features")
@@ -21,38 +56,40 @@ def process_large_dataset(num_rows=10_000_000, num_features=100):
     print("[Data Processing] Cleaning data...")
     
     # Remove outliers (beyond 3 standard deviations)
-    for col in range(num_features):
-        col_data = data[:, col]
-        mean = np.mean(col_data)
-        std = np.std(col_data)
-        mask = np.abs(col_data - mean) <= 3 * std
-        data[:, col] = np.where(mask, col_data, mean)
+    replace_outliers(data, num_std=3)
     
     # Feature engineering
     print("[Data Processing] Engineering features...")
     
-    # Create polynomial features
-    new_features = []
-    for i in range(min(10, num_features)):
-        for j in range(i, min(10, num_features)):
-            if i != j:
-                poly_feature = data[:, i] * data[:, j]
-                new_features.append(poly_feature)
-    
-    if new_features:
-        poly_data = np.column_stack(new_features)
-        data = np.hstack([data, poly_data])
-        print(f"[Data Processing] Added {len(new_features)} polynomial features")
+    # Create polynomial features: products of each pair (i < j) of the first
+    # 10 columns, written block by block straight into the widened array
+    left, right = np.triu_indices(min(10, num_features), k=1)
+    if len(left):
+        expanded = np.empty((num_rows, num_features + len(left)), dtype=data.dtype)
+        expanded[:, :num_features] = data
+        for start in range(0, num_rows, BLOCK_ROWS):
+            rows = data[start:start + BLOCK_ROWS]
+            np.multiply(rows[:, left], rows[:, right],
+                        out=expanded[start:start + BLOCK_ROWS, num_features:])
+        data = expanded
+        print(f"[Data Processing] Added {len(left)} polynomial features")
     
     # Normalization
     print("[Data Processing] Normalizing features...")
-    data = (data - np.mean(data, axis=0)) / (np.std(data, axis=0) + 1e-8)
+    # (in place, block by block: no full-size temporaries)
+    mean, std = column_mean_std(data)
+    inv_std = (1.0 / (std + 1e-8)).astype(data.dtype)
+    for start in range(0, num_rows, BLOCK_ROWS):
+        block = data[start:start + BLOCK_ROWS]
+        block -= mean
+        block *= inv_std
     
     # Aggregations
     print("[Data Processing] Computing aggregations...")
+    mean, std = column_mean_std(data)
     aggregations = {
-        'mean': np.mean(data, axis=0),
-        'std': np.std(data, axis=0),
+        'mean': mean,
+        'std': std,
         'min': np.min(data, axis=0),
         'max': np.max(data, axis=0),
         'median': np.median(data, axis=0),
@@ -64,47 +101,69 @@ def process_large_dataset(num_rows=10_000_000, num_features=100):
     return data, aggregations
 
 
-def time_series_processing(num_series=1000, series_length=10000):
-    """Process multiple time series with various operations."""
+def time_series_processing(num_series=1000, series_length=10000, batch_size=100):
+    """
+    Process multiple time series with various operations.
+
+    Series are handled batch_size at a time as rows of a 2-D array, and the
+    results come back as one (num_series, ...) array per output.
+    """
     print(f"[Data Processing] Processing {num_series} time series of length {series_length}")
     
     np.random.seed(42)
-    processed_series = []
+    window = 100
+    trend = np.sin(np.linspace(0, 4*np.pi, series_length))
+    processed = {
+        'series': np.empty((num_series, series_length)),
+        'moving_avg': np.empty((num_series, abs(series_length - window) + 1)),
+        'diff': np.empty((num_series, max(series_length - 1, 0))),
+        'power_spectrum': np.empty((num_series, series_length)),
+        'autocorr': np.empty((num_series, series_length)),
+    }
     
-    for i in range(num_series):
-        # Generate time series
-        series = np.cumsum(np.random.randn(series_length)) + np.sin(np.linspace(0, 4*np.pi, series_length))
+    for start in range(0, num_series, batch_size):
+        stop = min(start + batch_size, num_series)
+        
+        # Generate time series (drawn row by row from the same random stream
+        # as generating them one at a time)
+        series = processed['series'][start:stop]
+        np.cumsum(np.random.randn(stop - start, series_length), axis=1, out=series)
+        series += trend
         
         # Apply transformations
         # 1. Moving average
-        window = 100
-        moving_avg = np.convolve(series, np.ones(window)/window, mode='valid')
+        # (running sums: O(N) instead of an O(N*window) convolution)
+        moving_avg = processed['moving_avg'][start:stop]
+        if series_length >= window:
+            csum = np.cumsum(series, axis=1)
+            moving_avg[:, 0] = csum[:, window - 1]
+            np.subtract(csum[:, window:], csum[:, :-window], out=moving_avg[:, 1:])
+            moving_avg /= window
+        else:
+            for row, one_series in zip(moving_avg, series):
+                row[:] = np.convolve(one_series, np.ones(window)/window, mode='valid')
         
         # 2. Differencing
-        diff = np.diff(series)
+        np.subtract(series[:, 1:], series[:, :-1], out=processed['diff'][start:stop])
         
         # 3. FFT for frequency analysis
-        fft = np.fft.fft(series)
-        power_spectrum = np.abs(fft)**2
-        
-        # 4. Autocorrelation
-        autocorr = np.correlate(series, series, mode='full')
-        autocorr = autocorr[len(autocorr)//2:]
-        autocorr = autocorr / autocorr[0]  # Normalize
+        fft = np.fft.fft(series, axis=1)
+        np.abs(fft, out=processed['power_spectrum'][start:stop])
+        processed['power_spectrum'][start:stop] **= 2
         
-        processed_series.append({
-            'series': series,
-            'moving_avg': moving_avg,
-            'diff': diff,
-            'power_spectrum': power_spectrum,
-            'autocorr': autocorr,
-        })
+        # 4. Autocorrelation (Wiener-Khinchin: inverse FFT of the power
+        # spectrum, zero-padded to 2N so lags don't wrap around; O(N log N)
+        # instead of np.correlate's O(N^2))
+        padded = np.fft.rfft(series, n=2 * series_length, axis=1)
+        autocorr = np.fft.irfft(padded.real**2 + padded.imag**2, n=2 * series_length, axis=1)
+        np.divide(autocorr[:, :series_length], autocorr[:, :1],  # Normalize
+                  out=processed['autocorr'][start:stop])
         
-        if (i + 1) % 100 == 0:
-            print(f"[Data Processing] Processed {i+1}/{num_series} time series")
+        if stop % 100 == 0:
+            print(f"[Data Processing] Processed {stop}/{num_series} time series")
     
-    print(f"[Data Processing] Successfully processed {len(processed_series)} time series")
-    return processed_series
+    print(f"[Data Processing] Successfully processed {num_series} time series")
+    return processed
 
 
 def parallel_sorting(num_elements=50_000_000):
@@ -127,8 +186,10 @@ def parallel_sorting(num_elements=50_000_000):
     k = 1000
     print(f"[Data Processing] Finding top {k} elements...")
     start = time.time()
-    top_k = np.partition(data, -k)[-k:]
-    top_k_sorted = np.sort(top_k)
+    # data isn't needed after this, so partition it in place rather than
+    # allocating a full-size partitioned copy
+    data.partition(-k)
+    top_k_sorted = np.sort(data[-k:])
     topk_time = time.time() - start
     print(f"[Data Processing] Top-k selection completed in {topk_time:.2f}s")
     
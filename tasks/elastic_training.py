@@ -28,17 +28,27 @@ except ImportError:
 # Global state for handling resource changes
 current_cpus = None
 control_file = None
-should_check_resources = True
+resources_changed = threading.Event()  # set by SIGUSR1; start by reading once
+resources_changed.set()
+control_file_stamp = None  # (inode, mtime) of the control file last read
 resource_lock = threading.Lock()
 
 
 def signal_handler(signum, frame):
     """Handle SIGUSR1 signal indicating resource change."""
-    global should_check_resources
-    should_check_resources = True
+    resources_changed.set()
     print(f"[Elastic Training] Received resource change signal (SIGUSR1)")
 
 
+def get_control_file_stamp():
+    """Identify the current control file contents without opening it."""
+    try:
+        st = os.stat(control_file)
+    except (OSError, TypeError):
+        return None
+    return (st.st_ino, st.st_mtime_ns)
+
+
 def read_control_file(control_file_path):
     """Read current resource allocation from control file."""
     if not os.path.exists(control_file_path):
@@ -85,20 +95,22 @@ def get_current_cpus():
 
 def check_and_update_resources():
     """Check for resource changes and update accordingly."""
-    global current_cpus, should_check_resources
+    global current_cpus, control_file_stamp
     
-    if not should_check_resources:
+    # Only re-read the control file after a SIGUSR1 or when it has been
+    # replaced/modified since the last read (one stat, e.g. if the signal
+    # arrived before the handler was installed)
+    if not resources_changed.is_set() and get_control_file_stamp() == control_file_stamp:
         return current_cpus
     
     with resource_lock:
-        if not should_check_resources:
-            return current_cpus
+        resources_changed.clear()
+        control_file_stamp = get_control_file_stamp()
         
         new_cpus = get_current_cpus()
         if new_cpus != current_cpus:
             old_cpus = current_cpus
             current_cpus = new_cpus
-            should_check_resources = False
             
             if old_cpus is not None:
                 print(f"[Elastic Training] Resource change detected: {old_cpus} -> {new_cpus} CPUs")
@@ -125,15 +137,24 @@ def simulate_training_epoch(epoch, num_cpus, batch_size_base=128):
     # More CPUs = more parallel operations
     num_batches = 100 // num_cpus  # Adjust batches based on CPUs
     
+    # Allocate the batch matrices once per epoch and refill them in place
+    # (float32 draws directly, no float64 temporaries to cast)
+    rng = np.random.default_rng()
+    a = np.empty((1000, 1000), dtype=np.float32)
+    b = np.empty_like(a)
+    c = np.empty_like(a)
+    grad = np.empty_like(a)
+    out = np.empty_like(a)
+    
     for batch in range(num_batches):
         # Simulate forward pass
-        a = np.random.randn(1000, 1000).astype(np.float32)
-        b = np.random.randn(1000, 1000).astype(np.float32)
-        c = np.dot(a, b)
+        rng.standard_normal(dtype=np.float32, out=a)
+        rng.standard_normal(dtype=np.float32, out=b)
+        np.matmul(a, b, out=c)
         
         # Simulate backward pass
-        grad = np.random.randn(1000, 1000).astype(np.float32)
-        _ = np.dot(c, grad)
+        rng.standard_normal(dtype=np.float32, out=grad)
+        np.matmul(c, grad, out=out)
         
         # Check for resource changes periodically
         if batch % 10 == 0:
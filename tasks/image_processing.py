@@ -7,48 +7,119 @@ import numpy as np
 import time
 import os
 
+# Rows per block when accumulating image statistics; bounds the float64
+# temporaries to a strip instead of a full-image copy
+STATS_BLOCK_ROWS = 64
+
+def gaussian_kernel_1d(size=15, sigma=2.0):
+    """Normalized 1-D Gaussian kernel with `size` taps."""
+    x = np.arange(size) - size // 2
+    kernel = np.exp(-x**2 / (2 * sigma**2))
+    return (kernel / kernel.sum()).astype(np.float32)
+
+
+def blur_workspace(shape, kernel_size):
+    """Pad, accumulator and term buffers for separable_blur on (H, W, C) images."""
+    radius = kernel_size // 2
+    height, width, channels = shape
+    pad = np.empty(max(height + 2 * radius, width + 2 * radius) * max(height, width) * channels,
+                   dtype=np.float32)
+    return pad, np.empty(shape, dtype=np.float32), np.empty(shape, dtype=np.float32)
+
+
+def reflect_pad(image, radius, axis, out):
+    """
+    np.pad(image, radius, mode='reflect') along one axis, written into out
+    (the axis must be longer than radius).
+    """
+    src = np.moveaxis(image, axis, 0)
+    dst = np.moveaxis(out, axis, 0)
+    length = src.shape[0]
+    dst[radius:radius + length] = src
+    dst[:radius] = src[radius:0:-1]
+    dst[radius + length:] = src[length - 1 - radius:length - 1][::-1]
+    return out
+
+
+def separable_blur(image, kernel, work=None):
+    """
+    Blur an (H, W, C) image by convolving rows and then columns with a 1-D
+    kernel (edges reflected): O(H*W*K) work instead of O(H*W*K^2) for the
+    equivalent 2-D kernel.
+
+    Pass work=blur_workspace(...) to reuse the buffers across images; the
+    result is then written into (and aliases) its accumulator.
+    """
+    radius = len(kernel) // 2
+    pad, out, term = work if work is not None else blur_workspace(image.shape, len(kernel))
+    src = image
+    for axis in (0, 1):
+        padded_shape = list(image.shape)
+        padded_shape[axis] += 2 * radius
+        padded = reflect_pad(src, radius, axis, pad[:np.prod(padded_shape)].reshape(padded_shape))
+        
+        out.fill(0.0)
+        length = image.shape[axis]
+        for k, weight in enumerate(kernel):
+            window = padded[k:k + length] if axis == 0 else padded[:, k:k + length]
+            np.multiply(window, weight, out=term)
+            out += term
+        src = out
+    return out
+
+
+def image_moments(image, block_rows=STATS_BLOCK_ROWS):
+    """Mean and standard deviation of an image, accumulated a strip at a time."""
+    total = total_sq = 0.0
+    for r0 in range(0, image.shape[0], block_rows):
+        block = image[r0:r0 + block_rows].reshape(-1).astype(np.float64)
+        total += block.sum()
+        total_sq += block @ block
+    n = image.size
+    mean = total / n
+    return mean, np.sqrt(max(total_sq / n - mean * mean, 0.0))
+
+
 def process_image_batch(num_images=1000, image_size=2048):
     """Process a batch of images with various transformations."""
     print(f"[Image Processing] Processing {num_images} images of size {image_size}x{image_size}")
     
     np.random.seed(42)
     processed_count = 0
+    kernel = gaussian_kernel_1d(size=15, sigma=2.0)
+    # Reused for every image instead of allocating fresh float copies each time
+    image_float = np.empty((image_size, image_size, 3), dtype=np.float32)
+    blur_work = blur_workspace(image_float.shape, len(kernel))
     
     for i in range(num_images):
         # Simulate loading image (large array)
         image = np.random.randint(0, 255, (image_size, image_size, 3), dtype=np.uint8)
         
         # Convert to float for processing
-        image_float = image.astype(np.float32) / 255.0
+        np.divide(image, 255.0, out=image_float, dtype=np.float32)
         
         # Apply transformations (CPU intensive)
-        # 1. Gaussian blur simulation (convolution)
-        kernel_size = 15
-        kernel = np.random.randn(kernel_size, kernel_size)
-        kernel = kernel / np.sum(kernel)
-        
-        # Simulate convolution (simplified)
-        blurred = np.convolve(image_float.flatten(), kernel.flatten(), mode='same')
-        blurred = blurred.reshape(image_float.shape)
+        # 1. Gaussian blur (separable: a 15-tap pass along each axis)
+        blurred = separable_blur(image_float, kernel, work=blur_work)
         
         # 2. Edge detection (gradient computation)
         grad_x = np.gradient(blurred[:, :, 0], axis=1)
         grad_y = np.gradient(blurred[:, :, 0], axis=0)
-        edges = np.sqrt(grad_x**2 + grad_y**2)
+        edges = np.hypot(grad_x, grad_y)
         
-        # 3. Feature extraction (compute statistics)
+        # 3. Feature extraction (max/min on the uint8 pixels, a quarter of
+        # the bytes of the float copy, then rescaled)
+        mean, std = image_moments(image_float)
         features = {
-            'mean': np.mean(image_float),
-            'std': np.std(image_float),
-            'max': np.max(image_float),
-            'min': np.min(image_float),
+            'mean': mean,
+            'std': std,
+            'max': image.max() / 255.0,
+            'min': image.min() / 255.0,
             'edge_strength': np.mean(edges),
         }
         
-        # 4. Resize simulation (downsample)
-        scale_factor = 0.5
-        new_size = int(image_size * scale_factor)
-        resized = np.random.randn(new_size, new_size, 3)  # Simulated resize
+        # 4. Resize (downsample by 2: a strided view, no copy)
+        resized = image[::2, ::2, :]
         
         processed_count += 1
         
@@ -63,20 +134,33 @@ def feature_extraction_pipeline(num_images=500, feature_dim=2048):
     """Extract features from images (simulating CNN feature extraction)."""
     print(f"[Image Processing] Feature extraction: {num_images} images, {feature_dim}D features")
     
-    np.random.seed(42)
-    features_list = []
+    rng = np.random.default_rng(42)
+    num_layers = 5
+    
+    # Every image goes through the same shapes, so allocate one float32
+    # workspace per layer up front and refill it in place for each image
+    image = np.empty((224, 224, 3), dtype=np.float32)
+    layer_shapes = []
+    shape = image.shape
+    for layer in range(num_layers):
+        layer_shapes.append(shape)
+        if layer % 2 == 0:
+            shape = ((shape[0] + 1) // 2, (shape[1] + 1) // 2, shape[2])
+    workspaces = [np.empty(layer_shape, dtype=np.float32) for layer_shape in layer_shapes]
+    features_array = np.empty((num_images, feature_dim), dtype=np.float32)
     
     for i in range(num_images):
         # Simulate image
-        image = np.random.randn(224, 224, 3).astype(np.float32)
+        rng.standard_normal(dtype=np.float32, out=image)
         
         # Simulate feature extraction (multiple convolutional layers)
         # This simulates the computational cost of CNN forward pass
         x = image
-        for layer in range(5):  # 5 layers
+        for layer in range(num_layers):
             # Simulate convolution + activation
-            x = np.random.randn(*x.shape).astype(np.float32)
-            x = np.maximum(0, x)  # ReLU activation
+            x = workspaces[layer]
+            rng.standard_normal(dtype=np.float32, out=x)
+            np.maximum(x, 0, out=x)  # ReLU activation
             
             # Simulate pooling
             if layer % 2 == 0:
@@ -85,16 +169,12 @@ def feature_extraction_pipeline(num_images=500, feature_dim=2048):
         # Global average pooling
         feature_vector = np.mean(x, axis=(0, 1))
         
-        # Expand to desired dimension
-        if len(feature_vector) < feature_dim:
-            feature_vector = np.tile(feature_vector, feature_dim // len(feature_vector) + 1)[:feature_dim]
-        
-        features_list.append(feature_vector)
+        # Expand to desired dimension (repeating the pooled channels)
+        features_array[i] = np.resize(feature_vector, feature_dim)
         
         if (i + 1) % 50 == 0:
             print(f"[Image Processing] Extracted features from {i+1}/{num_images} images")
     
-    features_array = np.array(features_list)
     print(f"[Image Processing] Feature matrix shape: {features_array.shape}")
     
     return features_array
@@ -11,22 +11,32 @@ def matrix_multiplication_benchmark(matrix_size=5000, num_iterations=10):
     """Perform large matrix multiplications."""
     print(f"[Matrix Ops] Starting benchmark: size={matrix_size}x{matrix_size}, iterations={num_iterations}")
     
-    np.random.seed(42)
+    rng = np.random.default_rng(42)
     results = []
+    eig_size = min(100, matrix_size)
+    basis = np.eye(matrix_size, eig_size, dtype=np.float32)  # e_0 .. e_{k-1}
+    # Operand and product buffers, refilled every iteration
+    A = np.empty((matrix_size, matrix_size), dtype=np.float32)
+    B = np.empty_like(A)
+    C = np.empty_like(A)
     
     for i in range(num_iterations):
         iter_start = time.time()
         
         # Generate large matrices
-        A = np.random.randn(matrix_size, matrix_size).astype(np.float32)
-        B = np.random.randn(matrix_size, matrix_size).astype(np.float32)
+        rng.standard_normal(dtype=np.float32, out=A)
+        rng.standard_normal(dtype=np.float32, out=B)
         
         # Matrix multiplication (very CPU intensive)
-        C = np.dot(A, B)
+        np.dot(A, B, out=C)
         
-        # Additional operations
-        D = np.linalg.inv(C + np.eye(matrix_size) * 0.01)  # Matrix inversion
-        eigenvalues = np.linalg.eigvals(D[:min(100, matrix_size), :min(100, matrix_size)])
+        # Additional operations: shift the diagonal in place (C stays
+        # float32; adding a float64 identity would upcast the inverse)
+        C.flat[::matrix_size + 1] += 0.01
+        # Only the leading eig_size x eig_size block of inv(C) is used, so
+        # solve for its first eig_size columns instead of forming the inverse
+        D = np.linalg.solve(C, basis)
+        eigenvalues = np.linalg.eigvals(D[:eig_size])
         
         iter_time = time.time() - iter_start
         results.append(iter_time)
@@ -44,10 +54,10 @@ def svd_decomposition(matrix_size=3000):
     """Perform Singular Value Decomposition on large matrices."""
     print(f"[Matrix Ops] SVD decomposition: size={matrix_size}x{matrix_size}")
     
-    np.random.seed(42)
+    rng = np.random.default_rng(42)
     
     # Generate large matrix
-    A = np.random.randn(matrix_size, matrix_size).astype(np.float32)
+    A = rng.standard_normal((matrix_size, matrix_size), dtype=np.float32)
     
     start_time = time.time()
     
@@ -66,11 +76,15 @@ def cholesky_factorization(matrix_size=4000):
     """Perform Cholesky decomposition (common in optimization)."""
     print(f"[Matrix Ops] Cholesky factorization: size={matrix_size}x{matrix_size}")
     
-    np.random.seed(42)
+    rng = np.random.default_rng(42)
     
     # Generate positive definite matrix
-    A = np.random.randn(matrix_size, matrix_size).astype(np.float32)
-    A = np.dot(A, A.T) + np.eye(matrix_size) * 0.1  # Make it positive definite
+    A = rng.standard_normal((matrix_size, matrix_size), dtype=np.float32)
+    # Make it positive definite. NumPy computes A @ A.T with a symmetric
+    # rank-k update (syrk); the shift goes on the diagonal in place so A
+    # stays float32 (a float64 identity would upcast it)
+    A = np.dot(A, A.T)
+    A.flat[::matrix_size + 1] += 0.1
     
     start_time = time.time()
     
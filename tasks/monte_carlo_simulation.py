@@ -8,18 +8,32 @@ import time
 import os
 import sys
 
+# Samples drawn per chunk in monte_carlo_pi (two float32 coordinates each)
+PI_CHUNK_SAMPLES = 1 << 22
+
+# Paths simulated together in monte_carlo_option_pricing (~32 MB of shocks)
+OPTION_BATCH_PATHS = 16384
+
 def monte_carlo_pi(num_samples=100_000_000):
     """Estimate pi using Monte Carlo method."""
     print(f"[Monte Carlo] Starting simulation with {num_samples:,} samples")
     
-    # Generate random points
-    np.random.seed(42)
-    x = np.random.uniform(-1, 1, num_samples)
-    y = np.random.uniform(-1, 1, num_samples)
-    
-    # Count points inside unit circle
-    inside_circle = (x**2 + y**2) <= 1
-    count_inside = np.sum(inside_circle)
+    # Sample points in the unit square a chunk at a time (reusing one
+    # buffer) and count those inside the quarter circle x^2 + y^2 <= 1
+    rng = np.random.default_rng(42)
+    xy = np.empty((2, PI_CHUNK_SAMPLES), dtype=np.float32)
+    inside = np.empty(PI_CHUNK_SAMPLES, dtype=bool)
+    count_inside = 0
+    for start in range(0, num_samples, PI_CHUNK_SAMPLES):
+        n = min(PI_CHUNK_SAMPLES, num_samples - start)
+        x, y = xy[0, :n], xy[1, :n]
+        rng.random(dtype=np.float32, out=x)
+        rng.random(dtype=np.float32, out=y)
+        
+        np.multiply(x, x, out=x)
+        np.multiply(y, y, out=y)
+        x += y
+        count_inside += int(np.count_nonzero(np.less_equal(x, 1.0, out=inside[:n])))
     
     # Estimate pi
     pi_estimate = 4 * count_inside / num_samples
@@ -43,30 +57,34 @@ def monte_carlo_option_pricing(num_simulations=10_000_000):
     r = 0.05    # Risk-free rate
     sigma = 0.2 # Volatility
     
-    np.random.seed(42)
+    rng = np.random.default_rng(42)
     
     # Generate random paths
     dt = T / 252  # Daily steps
     num_steps = int(T / dt)
     
-    # Simulate stock price paths
-    payoffs = []
-    for _ in range(num_simulations // 1000):  # Batch processing
+    # Simulate stock price paths, a batch of paths at a time. Only the
+    # terminal price matters, so each path is S0 * exp(sum of log-returns)
+    drift = (r - 0.5 * sigma**2) * dt
+    vol = sigma * np.sqrt(dt)
+    total_payoff = 0.0
+    for start in range(0, num_simulations, OPTION_BATCH_PATHS):
+        batch = min(OPTION_BATCH_PATHS, num_simulations - start)
         # Generate random increments
-        random_shocks = np.random.normal(0, 1, (1000, num_steps))
+        random_shocks = rng.standard_normal((batch, num_steps), dtype=np.float32)
+        
+        log_returns = random_shocks.sum(axis=1, dtype=np.float64)
+        log_returns *= vol
+        log_returns += drift * num_steps
+        S_T = np.exp(log_returns, out=log_returns)
+        S_T *= S0
         
-        # Simulate price paths
-        for i in range(1000):
-            S = S0
-            for step in range(num_steps):
-                S *= np.exp((r - 0.5 * sigma**2) * dt + sigma * np.sqrt(dt) * random_shocks[i, step])
-            
-            # Calculate payoff (European call option)
-            payoff = max(S - K, 0)
-            payoffs.append(payoff)
+        # Calculate payoff (European call option)
+        S_T -= K
+        total_payoff += np.maximum(S_T, 0.0, out=S_T).sum()
     
     # Discount and average
-    option_price = np.exp(-r * T) * np.mean(payoffs)
+    option_price = np.exp(-r * T) * total_payoff / num_simulations
     
     print(f"[Monte Carlo] Estimated option price: ${option_price:.4f}")
     return option_price
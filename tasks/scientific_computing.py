@@ -7,6 +7,98 @@ import numpy as np
 import time
 import os
 
+# Body pairs per block in the N-body force pass; bounds the (rows, N, 3)
+# temporaries to a few tens of MB instead of O(N^2)
+NBODY_BLOCK_PAIRS = 1 << 20
+
+# Heat equation: time steps fused per sweep of the grid, and rows per
+# cache-resident strip within a sweep
+HEAT_TIME_BLOCK = 4
+HEAT_STRIP_ROWS = 64
+
+def pairwise_forces(positions, masses, G, out, block_pairs=NBODY_BLOCK_PAIRS):
+    """
+    Gravitational force on every body from all others, written into out.
+
+    Each pair is evaluated once (F_ji = -F_ij): a block of bodies is paired
+    with itself and every later body, and the reaction is subtracted from
+    the later bodies. Blocks hold about block_pairs pairs so temporaries
+    stay bounded. Pairs closer than 0.1 (including a body with itself)
+    contribute no force to avoid division by zero.
+    """
+    num_bodies = positions.shape[0]
+    out.fill(0.0)
+    
+    start = 0
+    while start < num_bodies:
+        stop = min(start + max(1, block_pairs // (num_bodies - start)), num_bodies)
+        # diff[i, j] is the vector from body start+i to body start+j
+        diff = positions[np.newaxis, start:, :] - positions[start:stop, np.newaxis, :]
+        dist2 = np.einsum('ijk,ijk->ij', diff, diff)
+        
+        close = dist2 <= 0.01
+        dist2[close] = 1.0
+        weights = np.power(dist2, -1.5, out=dist2)
+        weights[close] = 0.0
+        
+        # F_ij = G * m_i * m_j * r_vec / r^3
+        weights *= masses[np.newaxis, start:]
+        weights *= (G * masses[start:stop])[:, np.newaxis]
+        out[start:stop] += np.einsum('ij,ijk->ik', weights, diff)
+        
+        # Reactions on later bodies (pairs within the block were already
+        # counted from both sides above)
+        tail = stop - start
+        out[stop:] -= np.einsum('ij,ijk->jk', weights[:, tail:], diff[:, tail:])
+        start = stop
+    return out
+
+
+def heat_workspace(u, max_steps=HEAT_TIME_BLOCK, strip_rows=HEAT_STRIP_ROWS):
+    """Strip tile and Laplacian buffers for heat_steps, sized for max_steps."""
+    tile = np.empty((strip_rows + 2 * max_steps, u.shape[1]), dtype=u.dtype)
+    laplacian = np.empty((tile.shape[0] - 2, tile.shape[1] - 2), dtype=u.dtype)
+    return tile, laplacian
+
+
+def heat_steps(u, out, steps, coef, strip_rows=HEAT_STRIP_ROWS, work=None):
+    """
+    Advance the explicit heat-equation update `steps` times from u into out.
+
+    The grid is swept in strips of rows. Each strip is copied with a halo
+    of `steps` rows on either side and stepped `steps` times while it is
+    cache-resident (the halo absorbs the stale edge rows), so the full grid
+    is streamed once per call rather than once per step. Edges of the grid
+    are held at zero. Pass work=heat_workspace(...) to reuse the buffers
+    across calls.
+    """
+    num_rows = u.shape[0]
+    tile, laplacian = work if work is not None else heat_workspace(u, steps, strip_rows)
+    
+    for r0 in range(1, num_rows - 1, strip_rows):
+        r1 = min(r0 + strip_rows, num_rows - 1)
+        lo, hi = max(r0 - steps, 0), min(r1 + steps, num_rows)
+        t = tile[:hi - lo]
+        np.copyto(t, u[lo:hi])
+        inner = t[1:-1, 1:-1]
+        lap = laplacian[:hi - lo - 2]
+        
+        for _ in range(steps):
+            # Compute Laplacian using finite differences
+            np.multiply(inner, -4.0, out=lap)
+            lap += t[2:, 1:-1]
+            lap += t[:-2, 1:-1]
+            lap += t[1:-1, 2:]
+            lap += t[1:-1, :-2]
+            
+            # Update using explicit Euler method
+            lap *= coef
+            inner += lap
+        
+        out[r0:r1] = t[r0 - lo:r1 - lo]
+    return out
+
+
 def solve_heat_equation(grid_size=1000, time_steps=1000):
     """Solve 2D heat equation using finite difference method."""
     print(f"[Scientific Computing] Solving heat equation: grid={grid_size}x{grid_size}, steps={time_steps}")
@@ -29,25 +121,22 @@ def solve_heat_equation(grid_size=1000, time_steps=1000):
     dt = 0.01
     dx = 1.0
     
-    # Time stepping
-    for step in range(time_steps):
-        # Compute Laplacian using finite differences
-        laplacian = np.zeros_like(u)
-        laplacian[1:-1, 1:-1] = (
-            u[2:, 1:-1] + u[:-2, 1:-1] + 
-            u[1:-1, 2:] + u[1:-1, :-2] - 
-            4 * u[1:-1, 1:-1]
-        ) / (dx**2)
-        
-        # Update using explicit Euler method
-        u[1:-1, 1:-1] += alpha * dt * laplacian[1:-1, 1:-1]
-        
-        # Maintain boundary conditions
-        u[0, :] = 0.0
-        u[-1, :] = 0.0
-        u[:, 0] = 0.0
-        u[:, -1] = 0.0
+    coef = alpha * dt / dx**2
+    
+    # Time stepping, HEAT_TIME_BLOCK steps at a time (cut short so the
+    # progress report still lands on every 100th step). Each block reads u
+    # and writes the second grid, then the two swap roles.
+    v = np.zeros_like(u)
+    work = heat_workspace(u)
+    done = 0
+    while done < time_steps:
+        next_report = 100 * -(-done // 100) + 1
+        steps = min(HEAT_TIME_BLOCK, time_steps - done, next_report - done)
+        heat_steps(u, v, steps, coef, work=work)
+        u, v = v, u
+        done += steps
         
+        step = done - 1
         if step % 100 == 0:
             max_temp = np.max(u)
             print(f"[Scientific Computing] Step {step}/{time_steps}, max temperature: {max_temp:.4f}")
@@ -60,32 +149,20 @@ def n_body_simulation(num_bodies=10000, time_steps=1000):
     """N-body gravitational simulation."""
     print(f"[Scientific Computing] N-body simulation: {num_bodies} bodies, {time_steps} steps")
     
-    np.random.seed(42)
+    rng = np.random.default_rng(42)
     
     # Initialize positions and velocities
-    positions = np.random.randn(num_bodies, 3).astype(np.float32) * 10.0
-    velocities = np.random.randn(num_bodies, 3).astype(np.float32) * 0.1
-    masses = np.random.uniform(0.1, 10.0, num_bodies).astype(np.float32)
+    positions = rng.standard_normal((num_bodies, 3), dtype=np.float32) * 10.0
+    velocities = rng.standard_normal((num_bodies, 3), dtype=np.float32) * 0.1
+    masses = rng.uniform(0.1, 10.0, num_bodies).astype(np.float32)
     
     dt = 0.01
     G = 1.0  # Gravitational constant
+    forces = np.empty_like(positions)
     
     for step in range(time_steps):
         # Compute forces between all pairs (O(n^2) operation)
-        forces = np.zeros_like(positions)
-        
-        for i in range(num_bodies):
-            for j in range(num_bodies):
-                if i != j:
-                    # Vector from i to j
-                    r_vec = positions[j] - positions[i]
-                    r = np.linalg.norm(r_vec)
-                    
-                    if r > 0.1:  # Avoid division by zero
-                        # Gravitational force
-                        force_magnitude = G * masses[i] * masses[j] / (r**2)
-                        force_vec = force_magnitude * r_vec / r
-                        forces[i] += force_vec
+        pairwise_forces(positions, masses, G, out=forces)
         
         # Update velocities and positions
         accelerations = forces / masses[:, np.newaxis]
@@ -104,12 +181,15 @@ def solve_linear_system(matrix_size=5000):
     """Solve large system of linear equations."""
     print(f"[Scientific Computing] Solving linear system: {matrix_size}x{matrix_size}")
     
-    np.random.seed(42)
+    rng = np.random.default_rng(42)
     
     # Generate system Ax = b
-    A = np.random.randn(matrix_size, matrix_size).astype(np.float32)
-    A = A + A.T + np.eye(matrix_size) * matrix_size  # Make it positive definite
-    b = np.random.randn(matrix_size).astype(np.float32)
+    A = rng.standard_normal((matrix_size, matrix_size), dtype=np.float32)
+    # Make it positive definite; the shift goes on the diagonal in place so
+    # A stays float32 (a float64 identity would upcast the whole system)
+    A = A + A.T
+    A.flat[::matrix_size + 1] += matrix_size
+    b = rng.standard_normal(matrix_size, dtype=np.float32)
     
     # Solve using various methods
     print("[Scientific Computing] Solving using LU decomposition...")
@@ -119,55 +199,95 @@ def solve_linear_system(matrix_size=5000):
     print(f"[Scientific Computing] LU solve completed in {lu_time:.2f}s")
     
     # Verify solution
-    residual = np.linalg.norm(A @ x_lu - b)
+    r = A @ x_lu  # gemv
+    r -= b
+    residual = np.sqrt(r @ r)
     print(f"[Scientific Computing] Residual: {residual:.2e}")
     
     return x_lu
 
 
+def stiffness_matvec(x, grid_size, num_fixed, out):
+    """
+    out = K @ x for the banded FEA stiffness matrix, without storing K.
+
+    The first num_fixed nodes are fixed: their rows and columns of K are
+    zeroed with a 1 on the diagonal.
+    """
+    free = x.copy()
+    free[:num_fixed] = 0.0
+    np.multiply(free, 4.0, out=out)
+    out[1:] -= free[:-1]
+    out[:-1] -= free[1:]
+    out[grid_size:] -= free[:-grid_size]
+    out[:-grid_size] -= free[grid_size:]
+    out[:num_fixed] = x[:num_fixed]
+    return out
+
+
+def conjugate_gradient(matvec, b, rtol=1e-6, max_iter=None):
+    """
+    Solve A x = b for symmetric positive definite A given as matvec(x, out).
+
+    Iterates in float64 until ||b - A x|| <= rtol * ||b||; returns
+    (x, iterations).
+    """
+    b = np.asarray(b, dtype=np.float64)
+    if max_iter is None:
+        max_iter = 10 * b.size
+    x = np.zeros_like(b)
+    r = b.copy()
+    p = r.copy()
+    Ap = np.empty_like(b)
+    rr = r @ r
+    tol2 = (rtol * rtol) * rr
+    
+    iterations = 0
+    while iterations < max_iter and rr > tol2:
+        matvec(p, Ap)
+        step = rr / (p @ Ap)
+        x += step * p
+        r -= step * Ap
+        rr_new = r @ r
+        p *= rr_new / rr
+        p += r
+        rr = rr_new
+        iterations += 1
+    return x, iterations
+
+
 def finite_element_analysis(grid_size=500):
     """Simulate finite element analysis (structural mechanics)."""
     print(f"[Scientific Computing] FEA simulation: grid={grid_size}x{grid_size}")
     
-    np.random.seed(42)
+    rng = np.random.default_rng(42)
     
     # Create stiffness matrix (simplified)
     num_nodes = grid_size * grid_size
     print(f"[Scientific Computing] Number of nodes: {num_nodes:,}")
     
-    # Simplified: create sparse-like structure
+    # Simplified band structure: 4 on the diagonal, -1 on the +/-1 and
+    # +/-grid_size off-diagonals. K has at most five nonzeros per row, so
+    # it is applied as a stencil (stiffness_matvec) instead of being
+    # stored as a num_nodes x num_nodes dense matrix.
     # In real FEA, this would be assembled from element matrices
-    K = np.zeros((num_nodes, num_nodes), dtype=np.float32)
-    
-    # Populate stiffness matrix (simplified band structure)
-    for i in range(num_nodes):
-        K[i, i] = 4.0  # Diagonal
-        if i > 0:
-            K[i, i-1] = -1.0  # Lower diagonal
-        if i < num_nodes - 1:
-            K[i, i+1] = -1.0  # Upper diagonal
-        if i >= grid_size:
-            K[i, i-grid_size] = -1.0  # Lower band
-        if i < num_nodes - grid_size:
-            K[i, i+grid_size] = -1.0  # Upper band
     
     # Apply boundary conditions (fix some nodes)
-    fixed_nodes = list(range(0, grid_size))  # Fix bottom edge
-    for node in fixed_nodes:
-        K[node, :] = 0.0
-        K[:, node] = 0.0
-        K[node, node] = 1.0
+    num_fixed = grid_size  # Fix bottom edge
     
     # Load vector
-    F = np.random.randn(num_nodes).astype(np.float32)
-    F[fixed_nodes] = 0.0  # No load on fixed nodes
+    F = rng.standard_normal(num_nodes, dtype=np.float32)
+    F[:num_fixed] = 0.0  # No load on fixed nodes
     
-    # Solve Ku = F
+    # Solve Ku = F (K is symmetric positive definite)
     print("[Scientific Computing] Solving system...")
     start = time.time()
-    u = np.linalg.solve(K, F)
+    u, iterations = conjugate_gradient(
+        lambda x, out: stiffness_matvec(x, grid_size, num_fixed, out), F
+    )
+    u = u.astype(np.float32)
     solve_time = time.time() - start
-    print(f"[Scientific Computing] System solved in {solve_time:.2f}s")
+    print(f"[Scientific Computing] System solved in {solve_time:.2f}s ({iterations} CG iterations)")
     
     max_displacement = np.max(np.abs(u))
     print(f"[Scientific Computing] Maximum displacement: {max_displacement:.4f}")
@@ -22,6 +22,15 @@ def simulate_training(epochs=50, batch_size=128, model_size="large"):
     
     print(f"[Training] Model parameters: {num_params:,}")
     
+    # Batch data is generated once and reused; every batch still performs
+    # the same forward and backward matrix multiplications
+    rng = np.random.default_rng(42)
+    a = rng.standard_normal((1000, 1000), dtype=np.float32)
+    b = rng.standard_normal((1000, 1000), dtype=np.float32)
+    grad = rng.standard_normal((1000, 1000), dtype=np.float32)
+    c = np.empty_like(a)
+    out = np.empty_like(a)
+    
     # Simulate training loop
     for epoch in range(epochs):
         epoch_start = time.time()
@@ -30,16 +39,13 @@ def simulate_training(epochs=50, batch_size=128, model_size="large"):
         # This is computationally intensive
         for batch in range(100):  # 100 batches per epoch
             # Simulate matrix multiplication (CPU intensive)
-            a = np.random.randn(1000, 1000).astype(np.float32)
-            b = np.random.randn(1000, 1000).astype(np.float32)
-            c = np.dot(a, b)
+            np.matmul(a, b, out=c)
             
             # Simulate backward pass
-            grad = np.random.randn(1000, 1000).astype(np.float32)
-            _ = np.dot(c, grad)
+            np.matmul(c, grad, out=out)
         
         epoch_time = time.time() - epoch_start
-        loss = np.random.uniform(0.5, 2.0)  # Simulated loss
+        loss = rng.uniform(0.5, 2.0)  # Simulated loss
         
         if epoch % 10 == 0:
             print(f"[Training] Epoch {epoch}/{epochs} - Loss: {loss:.4f} - Time: {epoch_time:.2f}s")
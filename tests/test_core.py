@@ -0,0 +1,160 @@
+"""Unit tests for MiniSlurm internals. Run with: pytest tests/test_core.py"""
+
+import heapq
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+from mini_slurm import core, database
+from mini_slurm.core import MiniSlurm, _split_simple_command
+
+
+@pytest.fixture
+def ms(tmp_path, monkeypatch):
+    """A MiniSlurm instance backed by a throwaway database and log dir."""
+    db_path = str(tmp_path / "jobs.db")
+    monkeypatch.setattr(database, "DB_PATH", db_path)
+    monkeypatch.setattr(core, "init_db", lambda: database.init_db(db_path))
+    monkeypatch.setattr(core, "LOG_DIR", str(tmp_path / "logs"))
+    monkeypatch.setattr(core, "TOPOLOGY_CONFIG_PATH", str(tmp_path / "topology.conf"))
+    instance = MiniSlurm(total_cpus=8, total_mem_mb=8192)
+    yield instance
+    instance.conn.close()
+
+
+def pending_commands(ms):
+    return {job_id: row[1] for _, _, job_id, row in ms._pending_heap if job_id in ms._pending_ids}
+
+
+def dispatch_order(ms):
+    """Job ids in the order the scheduler would pop them off the pending heap."""
+    heap = list(ms._pending_heap)
+    order = []
+    while heap:
+        job_id = heapq.heappop(heap)[2]
+        if job_id in ms._pending_ids:
+            order.append(job_id)
+    return order
+
+
+def test_heap_orders_by_priority_then_submission(ms):
+    ids = [ms.submit_job(cpus=1, mem_mb=100, command="true", priority=p) for p in (1, 5, 5, 0, 5, 1)]
+    # A batch shares one submit time; ties then fall back to job id
+    ids += ms.submit_jobs([{"cpus": 1, "mem_mb": 100, "command": "true", "priority": 5}] * 2)
+    expected = [ids[1], ids[2], ids[4], ids[6], ids[7], ids[0], ids[5], ids[3]]
+    assert dispatch_order(ms) == expected
+
+    # A rebuild from the database (as after a CLI submit) keeps the order
+    ms._data_version = None
+    ms._sync_pending()
+    assert dispatch_order(ms) == expected
+
+
+def test_cancelled_job_is_skipped(ms):
+    first, second = (ms.submit_job(cpus=1, mem_mb=100, command="true", priority=5) for _ in range(2))
+    assert ms.cancel_job(first)
+    assert dispatch_order(ms) == [second]
+
+
+def test_rolled_back_batch_is_not_queued(ms):
+    with pytest.raises(sqlite3.IntegrityError):
+        ms.submit_jobs([
+            {"cpus": 1, "mem_mb": 100, "command": "echo PHANTOM"},
+            {"cpus": 1, "mem_mb": 100, "command": None},  # violates NOT NULL
+        ])
+    assert pending_commands(ms) == {}
+
+    # The rolled-back rowid is handed out again; it must run the new command
+    job_id = ms.submit_job(cpus=1, mem_mb=100, command="echo REAL")
+    assert pending_commands(ms) == {job_id: "echo REAL"}
+
+
+def start_elastic(ms, running, cpus, min_cpus, max_cpus, priority=0, scaled_ago=None):
+    """Record a running elastic job as the scheduler would after starting it."""
+    job_id = ms.submit_job(cpus=cpus, mem_mb=100, command="true", priority=priority,
+                           is_elastic=True, min_cpus=min_cpus, max_cpus=max_cpus)
+    ms._pending_ids.discard(job_id)
+    ms.conn.execute("UPDATE jobs SET status = 'RUNNING' WHERE id = ?", (job_id,))
+    running[job_id] = {"proc": None, "cpus": cpus, "mem_mb": 100, "control_file": None,
+                       "min_cpus": min_cpus, "max_cpus": max_cpus}
+    if scaled_ago is not None:
+        running[job_id]["last_scale_time"] = time.monotonic() - scaled_ago
+    ms._used_cpus += cpus
+    ms._used_mem += 100
+    return job_id
+
+
+def test_rescale_gap_holds_back_scale_up(ms):
+    running = {}
+    cooling = start_elastic(ms, running, cpus=1, min_cpus=1, max_cpus=4, scaled_ago=5)
+    ready = start_elastic(ms, running, cpus=1, min_cpus=1, max_cpus=4, scaled_ago=60)
+    ms._scale_elastic_jobs(running, avail_cpus=6, scale_threshold=100.0, rescale_gap=30.0)
+    assert running[cooling]["cpus"] == 1
+    assert running[ready]["cpus"] == 4
+
+
+def test_rescale_gap_does_not_block_scale_down(ms):
+    running = {}
+    job_id = start_elastic(ms, running, cpus=8, min_cpus=2, max_cpus=8, scaled_ago=0)
+    ms.submit_job(cpus=4, mem_mb=100, command="true", priority=10)
+    # The cluster is full and the job was just rescaled, but the pending
+    # higher-priority job still gets its CPUs
+    ms._scale_elastic_jobs(running, avail_cpus=0, scale_threshold=0.0, rescale_gap=30.0)
+    assert running[job_id]["cpus"] == 4
+    assert ms.get_job(job_id)["current_cpus"] == 4
+
+
+@pytest.mark.parametrize("command, expected", [
+    ("python3 train.py --epochs 5", ({}, ["python3", "train.py", "--epochs", "5"])),
+    ("EPOCHS=5 MODEL='big one' python3 train.py",
+     ({"EPOCHS": "5", "MODEL": "big one"}, ["python3", "train.py"])),
+    ("echo 'a b' \"c d\"", ({}, ["echo", "a b", "c d"])),
+])
+def test_split_simple_command(command, expected):
+    assert _split_simple_command(command) == expected
+
+
+@pytest.mark.parametrize("command", [
+    "echo a | tr a b",
+    "true && false",
+    "sleep 1; echo done",
+    "echo $HOME",
+    "echo `date`",
+    "python3 train.py > out.log",
+    "ls *.py",
+    "cd ~",
+    "(echo sub)",
+    "echo 'unterminated",
+    "FOO=bar",
+    "",
+])
+def test_split_simple_command_falls_back_to_shell(command):
+    assert _split_simple_command(command) is None
+
+
+def test_queries_do_not_see_another_threads_open_transaction(ms):
+    inserted = threading.Event()
+    job_id = []
+
+    def write_then_roll_back():
+        with pytest.raises(RuntimeError):
+            with ms._transaction() as conn:
+                job_id.append(conn.execute(
+                    "INSERT INTO jobs (command, cpus, mem_mb, status, submit_time) "
+                    "VALUES ('echo UNCOMMITTED', 1, 100, 'PENDING', 0)").lastrowid)
+                inserted.set()
+                time.sleep(0.2)
+                raise RuntimeError("roll back")
+
+    writer = threading.Thread(target=write_then_roll_back)
+    writer.start()
+    inserted.wait()
+    assert list(ms.list_jobs()) == []
+    assert ms.get_job(job_id[0]) is None
+    assert ms.get_stats()["total_jobs"] == 0
+    writer.join()
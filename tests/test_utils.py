@@ -0,0 +1,30 @@
+"""Unit tests for mini_slurm.utils. Run with: pytest tests/test_utils.py"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+from mini_slurm.utils import parse_mem
+
+
+@pytest.mark.parametrize("mem, expected", [
+    ("8GB", 8192),
+    ("1024MB", 1024),
+    ("2g", 2048),
+    ("512m", 512),
+    ("512", 512),
+    ("1.5G", 1536),
+    (".5gb", 512),
+    (" 4 GB ", 4096),
+    ("0", 0),
+])
+def test_parse_mem_accepts(mem, expected):
+    assert parse_mem(mem) == expected
+
+
+@pytest.mark.parametrize("mem", ["", "GB", "-1G", "1TB", "1 G B", "1.2.3G", "1e3", "four", "8 GiB"])
+def test_parse_mem_rejects(mem):
+    with pytest.raises(ValueError):
+        parse_mem(mem)
@@ -9,7 +9,9 @@ This script:
 5. Verifies topology-aware scheduling behavior
 """
 
+import json
 import os
+import selectors
 import sys
 import time
 import subprocess
@@ -21,7 +23,8 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent))
 
 # Import from package
-sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+SRC_DIR = str(Path(__file__).parent.parent.parent / "src")
+sys.path.insert(0, SRC_DIR)
 from mini_slurm.core import MiniSlurm
 parse_mem = mini_slurm_module.parse_mem
 get_conn = mini_slurm_module.get_conn
@@ -42,65 +45,15 @@ SwitchName=switch4 Nodes=node[13-16]
 SwitchName=core1 Switches=switch[1-4]
 """
 
+# Checked-in CPU workload run by the submitted jobs
+WORKLOAD_SCRIPT = Path(__file__).parent / "test_workload.py"
+
 def create_test_topology_config(config_path):
     """Create a test topology configuration file."""
     with open(config_path, 'w') as f:
         f.write(TEST_TOPOLOGY_CONFIG)
     print(f"✓ Created topology config at {config_path}")
 
-def create_test_workload_script():
-    """Create a simple CPU-intensive workload script for testing."""
-    script_content = '''#!/usr/bin/env python3
-import time
-import os
-import sys
-
-# Get job ID from environment
-job_id = os.getenv("MINI_SLURM_JOB_ID", "unknown")
-is_elastic = os.getenv("MINI_SLURM_ELASTIC", "0") == "1"
-control_file = os.getenv("MINI_SLURM_CONTROL_FILE", "")
-
-print(f"[Job {job_id}] Starting workload...")
-print(f"[Job {job_id}] Elastic: {is_elastic}")
-
-if is_elastic:
-    print(f"[Job {job_id}] Control file: {control_file}")
-    if control_file and os.path.exists(control_file):
-        with open(control_file, 'r') as f:
-            print(f"[Job {job_id}] Control file contents:")
-            print(f.read())
-
-# Simulate CPU-intensive work
-duration = int(os.getenv("WORKLOAD_DURATION", "10"))
-print(f"[Job {job_id}] Running for {duration} seconds...")
-
-start_time = time.time()
-iterations = 0
-while time.time() - start_time < duration:
-    # CPU-intensive computation
-    result = sum(i * i for i in range(10000))
-    iterations += 1
-    if iterations % 1000 == 0:
-        elapsed = time.time() - start_time
-        print(f"[Job {job_id}] Iterations: {iterations}, Elapsed: {elapsed:.2f}s")
-        
-        # Check for elastic scaling updates
-        if is_elastic and control_file and os.path.exists(control_file):
-            with open(control_file, 'r') as f:
-                content = f.read()
-                if "SCALE_EVENT" in content:
-                    print(f"[Job {job_id}] Detected scale event!")
-
-print(f"[Job {job_id}] Completed after {iterations} iterations")
-'''
-    
-    script_path = Path(__file__).parent / "test_workload.py"
-    with open(script_path, 'w') as f:
-        f.write(script_content)
-    os.chmod(script_path, 0o755)
-    print(f"✓ Created test workload script at {script_path}")
-    return script_path
-
 def test_topology_aware_scheduling():
     """Test topology-aware scheduling with elastic workloads."""
     print("=" * 70)
@@ -111,7 +64,7 @@ def test_topology_aware_scheduling():
     # Setup
     config_path = os.path.expanduser("~/.mini_slurm_topology_test.conf")
     create_test_topology_config(config_path)
-    workload_script = create_test_workload_script()
+    workload_script = WORKLOAD_SCRIPT
     
     # Initialize MiniSlurm with test topology
     ms = MiniSlurm(
@@ -215,7 +168,7 @@ def test_topology_aware_scheduling():
     
     scheduler_proc = subprocess.Popen(
         [
-            "mini-slurm", "scheduler",
+            sys.executable, "-m", "mini_slurm", "scheduler",
             "--total-cpus", "16",
             "--total-mem", "32GB",
             "--topology-config", config_path,
@@ -224,19 +177,48 @@ def test_topology_aware_scheduling():
         ],
         stdout=subprocess.PIPE,
         stderr=subprocess.STDOUT,
-        text=True
+        text=True,
+        env={
+            **os.environ,
+            # Same package source as this test, logs streamed as printed
+            "PYTHONPATH": os.pathsep.join(
+                p for p in (SRC_DIR, os.environ.get("PYTHONPATH")) if p
+            ),
+            "PYTHONUNBUFFERED": "1",
+        },
     )
     
-    # Monitor for 30 seconds
+    # Monitor for 30 seconds, waking on scheduler output (echoed as it
+    # arrives, which also keeps the pipe from filling) or the next status tick
     start_time = time.time()
-    last_status_time = start_time
+    end_time = start_time + 30
+    next_status_time = start_time + 5
+    sel = selectors.DefaultSelector()
+    sel.register(scheduler_proc.stdout, selectors.EVENT_READ)
+    partial = b""
     
     try:
-        while time.time() - start_time < 30:
-            time.sleep(1)
+        while time.time() < end_time:
+            timeout = max(0.0, min(next_status_time, end_time) - time.time())
+            if sel.get_map():
+                events = sel.select(timeout)
+            else:
+                events = []
+                time.sleep(timeout)
+            
+            if events:
+                data = os.read(scheduler_proc.stdout.fileno(), 65536)
+                *lines, partial = (partial + data).split(b"\n")
+                if not data:
+                    sel.unregister(scheduler_proc.stdout)  # scheduler exited
+                    if partial:
+                        lines.append(partial)  # last line had no newline
+                        partial = b""
+                for line in lines:
+                    print(f"  [scheduler] {line.decode(errors='replace')}")
             
             # Print status every 5 seconds
-            if time.time() - last_status_time >= 5:
+            if time.time() >= next_status_time:
                 elapsed = time.time() - start_time
                 print(f"\n[{elapsed:.1f}s] Checking job status...")
                 
@@ -254,7 +236,6 @@ def test_topology_aware_scheduling():
                     nodes_str = ""
                     if nodes:
                         try:
-                            import json
                             nodes_list = json.loads(nodes)
                             nodes_str = f", Nodes={','.join(nodes_list)}"
                         except:
@@ -264,18 +245,24 @@ def test_topology_aware_scheduling():
                     print(f"  Job {job_id}: {status}, CPUs={cpus}{elastic_str}{nodes_str}")
                 
                 conn.close()
-                last_status_time = time.time()
+                next_status_time += 5
+        
+        # Output cut off mid-line when the monitoring window closed
+        if partial:
+            print(f"  [scheduler] {partial.decode(errors='replace')}")
         
         print("\n" + "=" * 70)
         print("Final Job Status:")
         print("=" * 70)
         
-        # Get final job details
+        # Get final job details (one query for all four jobs)
         conn = get_conn()
         c = conn.cursor()
+        c.execute("SELECT * FROM jobs WHERE id IN (?, ?, ?, ?) ORDER BY id",
+                  (job1, job2, job3, job4))
+        final_rows = {row[0]: row for row in c.fetchall()}
         for job_id in [job1, job2, job3, job4]:
-            c.execute("SELECT * FROM jobs WHERE id = ?", (job_id,))
-            job = c.fetchone()
+            job = final_rows.get(job_id)
             if job:
                 if len(job) >= 23:
                     (job_id_val, command, cpus, mem_mb, status, priority,
@@ -293,23 +280,27 @@ def test_topology_aware_scheduling():
                     print(f"  Elastic: {current_cpus}/{max_cpus} (min={min_cpus})")
                 if nodes:
                     try:
-                        import json
                         nodes_list = json.loads(nodes) if isinstance(nodes, str) else nodes
                         print(f"  Nodes: {','.join(nodes_list)}")
                         
                         # Analyze topology
                         if len(nodes_list) > 1:
-                            switches_used = set()
+                            # One representative node per leaf switch (nodes
+                            # on the same leaf are at distance 0); nodes with
+                            # no switch stand for themselves
+                            node_to_switch = ms.topology.node_to_switch
+                            representatives = {}
                             for node in nodes_list:
-                                switch = ms.topology.node_to_switch.get(node)
-                                if switch:
-                                    switches_used.add(switch)
+                                switch = node_to_switch.get(node)
+                                representatives.setdefault(switch or (None, node), node)
+                            switches_used = [k for k in representatives if isinstance(k, str)]
                             print(f"  Switches used: {','.join(sorted(switches_used))}")
                             
-                            # Calculate max distance
+                            # Calculate max distance over the representatives
+                            reps = list(representatives.values())
                             max_dist = 0
-                            for i, n1 in enumerate(nodes_list):
-                                for n2 in nodes_list[i+1:]:
+                            for i, n1 in enumerate(reps):
+                                for n2 in reps[i+1:]:
                                     dist = ms.topology.get_node_distance(n1, n2)
                                     max_dist = max(max_dist, dist)
                             print(f"  Max node distance: {max_dist}")
@@ -319,19 +310,19 @@ def test_topology_aware_scheduling():
                     print(f"  Wait time: {wait_time:.2f}s")
                 if runtime:
                     print(f"  Runtime: {runtime:.2f}s")
-        conn.close()
         
         print("\n" + "=" * 70)
         print("Test Summary:")
         print("=" * 70)
         
-        # Check if topology-aware scheduling worked
-        conn = get_conn()
-        c = conn.cursor()
-        c.execute("SELECT COUNT(*) FROM jobs WHERE nodes IS NOT NULL AND status IN ('RUNNING', 'COMPLETED', 'FAILED')")
-        jobs_with_nodes = c.fetchone()[0]
-        c.execute("SELECT COUNT(*) FROM jobs WHERE is_elastic = 1")
-        elastic_jobs = c.fetchone()[0]
+        # Check if topology-aware scheduling worked (same connection)
+        c.execute("""
+            SELECT
+                COALESCE(SUM(nodes IS NOT NULL AND status IN ('RUNNING', 'COMPLETED', 'FAILED')), 0),
+                COALESCE(SUM(is_elastic = 1), 0)
+            FROM jobs
+        """)
+        jobs_with_nodes, elastic_jobs = c.fetchone()
         conn.close()
         
         print(f"✓ Jobs with node assignments: {jobs_with_nodes}")
@@ -347,6 +338,7 @@ def test_topology_aware_scheduling():
     finally:
         # Cleanup
         print("\nCleaning up...")
+        sel.close()
         scheduler_proc.terminate()
         try:
             scheduler_proc.wait(timeout=5)
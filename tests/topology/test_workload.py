@@ -3,6 +3,8 @@ import time
 import os
 import sys
 
+import numpy as np
+
 # Get job ID from environment
 job_id = os.getenv("MINI_SLURM_JOB_ID", "unknown")
 is_elastic = os.getenv("MINI_SLURM_ELASTIC", "0") == "1"
@@ -18,25 +20,39 @@ if is_elastic:
             print(f"[Job {job_id}] Control file contents:")
             print(f.read())
 
-# Simulate CPU-intensive work
+# Simulate CPU-intensive work: a 10k-element integer dot product per
+# iteration (sum of squares, computed in C), reporting every REPORT_EVERY
+# iterations (~0.5s)
+SQ = np.arange(10000, dtype=np.int64)
+REPORT_EVERY = 100_000
 duration = int(os.getenv("WORKLOAD_DURATION", "10"))
 print(f"[Job {job_id}] Running for {duration} seconds...")
 
-start_time = time.time()
+# Monotonic clock (immune to wall-clock adjustments), checked against the
+# deadline once every 128 iterations
+start_time = time.monotonic()
+deadline = start_time + duration
 iterations = 0
-while time.time() - start_time < duration:
+control_stamp = None  # (inode, mtime) of the control file last read
+while iterations & 127 or time.monotonic() < deadline:
     # CPU-intensive computation
-    result = sum(i * i for i in range(10000))
+    result = int(np.dot(SQ, SQ))
     iterations += 1
-    if iterations % 1000 == 0:
-        elapsed = time.time() - start_time
+    if iterations % REPORT_EVERY == 0:
+        elapsed = time.monotonic() - start_time
         print(f"[Job {job_id}] Iterations: {iterations}, Elapsed: {elapsed:.2f}s")
         
-        # Check for elastic scaling updates
-        if is_elastic and control_file and os.path.exists(control_file):
-            with open(control_file, 'r') as f:
-                content = f.read()
-                if "SCALE_EVENT" in content:
-                    print(f"[Job {job_id}] Detected scale event!")
+        # Check for elastic scaling updates; one stat, and the file is
+        # only re-read when the scheduler has replaced or rewritten it
+        if is_elastic and control_file:
+            try:
+                st = os.stat(control_file)
+            except OSError:
+                st = None
+            if st is not None and (st.st_ino, st.st_mtime_ns) != control_stamp:
+                control_stamp = (st.st_ino, st.st_mtime_ns)
+                with open(control_file, 'rb') as f:
+                    if b"SCALE_EVENT" in f.read():
+                        print(f"[Job {job_id}] Detected scale event!")
 
 print(f"[Job {job_id}] Completed after {iterations} iterations")